@@ -11,22 +11,28 @@ Example Usage:
     from utils.aws import ssm_get_parameter
 """
 import contextlib
-import boto3
+import copy
+import hashlib
 import json
+import mimetypes
 import os
+import random
+import re
 import sys
 import base64
+import tarfile
 import time
 import typing
 import logging
 import uuid
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
 
 sys.path.insert(0, '/home/circleci/bin')
 
 import loggy
-from docker import docker as _docker, login as _docker_login
+from docker import docker as _docker, docker_batch as _docker_batch, login as _docker_login
 from common import subprocess_long as _long_run
 
 from subprocess_tee import run as _run
@@ -43,14 +49,13 @@ class AwsSession():
     session = None
     creds = None
     name = None
+    region = None
 
     def __init__(self, name):
         self.creds = AwsCreds()
         self.name = name
         self.session = None
 
-boto3.set_stream_logger('', logging.INFO)
-
 ECR_ACCOUNT_ID = os.environ.get('ECR_ACCOUNT_ID')
 ECR_ACCOUNT_REGION = os.environ.get('ECR_ACCOUNT_REGION', os.environ.get('AWS_DEFAULT_REGION', None))
 
@@ -58,6 +63,45 @@ ECR_ACCOUNT_REGION = os.environ.get('ECR_ACCOUNT_REGION', os.environ.get('AWS_DE
 Global Utils
 """
 
+#
+# Shared botocore session. Constructing a boto3.Session() from scratch re-runs
+# the full service-model/endpoint loader initialization, so we build the
+# botocore session once and hand it to every boto3.Session we create. All
+# sessions in a pipeline step use the same credential set, so sharing is safe.
+#
+__botocore_session = None
+
+
+def __get_botocore_session():
+    global __botocore_session
+    if __botocore_session is None:
+        import boto3
+        import botocore.session
+        boto3.set_stream_logger('', logging.INFO)
+        __botocore_session = botocore.session.get_session()
+    return __botocore_session
+
+
+#
+# The OIDC token file is valid for tens of minutes, so cache its contents
+# keyed on mtime instead of re-reading it on every init_session() call.
+#
+__web_identity_token_cache = (None, None)
+
+
+def __read_web_identity_token(path: str) -> str:
+    global __web_identity_token_cache
+    mtime = os.stat(path).st_mtime
+    if __web_identity_token_cache[0] == mtime:
+        return __web_identity_token_cache[1]
+
+    with open(path, "r") as content_file:
+        token = content_file.read()
+
+    __web_identity_token_cache = (mtime, token)
+    return token
+
+
 def init_session() -> AwsSession:
     """
     init_session()
@@ -69,6 +113,12 @@ def init_session() -> AwsSession:
 
     Returns a reusable AwsSession object
     """
+    #
+    # boto3 is imported on first use so CLI entrypoints that never touch AWS
+    # skip the several-hundred-ms service-model import cost.
+    #
+    import boto3
+
     _s = AwsSession("cicd")
 
 
@@ -77,9 +127,8 @@ def init_session() -> AwsSession:
 
         web_identity_token = os.environ.get('CIRCLE_OIDC_TOKEN_V2')
                        
-        if os.environ.get('AWS_WEB_IDENTITY_TOKEN_FILE'):            
-            with open(os.getenv("AWS_WEB_IDENTITY_TOKEN_FILE"), "r") as content_file:
-                web_identity_token = content_file.read()
+        if os.environ.get('AWS_WEB_IDENTITY_TOKEN_FILE'):
+            web_identity_token = __read_web_identity_token(os.getenv("AWS_WEB_IDENTITY_TOKEN_FILE"))
         
         if not web_identity_token:
             loggy.info(f"aws.init_session(): No CIRCLE_OIDC_TOKEN_V2 or AWS_WEB_IDENTITY_TOKEN_FILE found. Cannot log into AWS.")
@@ -106,39 +155,58 @@ def init_session() -> AwsSession:
         _s.creds.region = os.environ.get('AWS_DEFAULT_REGION', "us-east-1")
 
         _s.session = boto3.Session(
+            botocore_session=__get_botocore_session(),
             aws_access_key_id=_s.creds.access_key,
             aws_secret_access_key=_s.creds.secret_access_key,
             aws_session_token=_s.creds.session_token,
             region_name=_s.creds.region
         )
 
-        # Define the path to the credentials file
-        aws_dir = os.path.expanduser("~/.aws")
-        credentials_path = os.path.join(aws_dir, "credentials")
-
-        # Ensure the ~/.aws directory exists
-        if not os.path.exists(aws_dir):
-            os.makedirs(aws_dir)
-            print(f"Created directory: {aws_dir}")
-
-        # Write the credentials to the ~/.aws/credentials file
-        config = ConfigParser()
-
-        # Read existing credentials if the file already exists
-        if os.path.exists(credentials_path):
-            config.read(credentials_path)
+        #
+        # Only rewrite the ~/.aws/credentials file when the credential triple has
+        # actually changed. We keep a hash of the last write so repeated
+        # init_session() calls in the same pipeline skip the ConfigParser work.
+        #
+        creds_hash = hashlib.blake2b(
+            f"{_s.creds.access_key}:{_s.creds.secret_access_key}:{_s.creds.session_token}".encode()).hexdigest()
+        creds_hash_path = "/tmp/.cicd_aws_creds_hash"
+
+        last_hash = None
+        if os.path.exists(creds_hash_path):
+            with open(creds_hash_path, "r") as f:
+                last_hash = f.read().strip()
+
+        if creds_hash != last_hash:
+            # Define the path to the credentials file
+            aws_dir = os.path.expanduser("~/.aws")
+            credentials_path = os.path.join(aws_dir, "credentials")
+
+            # Ensure the ~/.aws directory exists
+            if not os.path.exists(aws_dir):
+                os.makedirs(aws_dir)
+                print(f"Created directory: {aws_dir}")
+
+            # Write the credentials to the ~/.aws/credentials file
+            config = ConfigParser()
+
+            # Read existing credentials if the file already exists
+            if os.path.exists(credentials_path):
+                config.read(credentials_path)
+
+            # Add the new profile with temporary credentials
+            config['default'] = {
+                "aws_access_key_id": _s.creds.access_key,
+                "aws_secret_access_key": _s.creds.secret_access_key,
+                "aws_session_token": _s.creds.session_token,
+                "region": _s.creds.region,
+            }
 
-        # Add the new profile with temporary credentials
-        config['default'] = {
-            "aws_access_key_id": _s.creds.access_key,
-            "aws_secret_access_key": _s.creds.secret_access_key,
-            "aws_session_token": _s.creds.session_token,
-            "region": _s.creds.region,
-        }
+            # Write back to the credentials file
+            with open(credentials_path, "w") as f:
+                config.write(f)
 
-        # Write back to the credentials file
-        with open(credentials_path, "w") as f:
-            config.write(f)
+            with open(creds_hash_path, "w") as f:
+                f.write(creds_hash)
 
 
     elif os.environ.get('AWS_PROFILE'):
@@ -147,6 +215,7 @@ def init_session() -> AwsSession:
         _s.creds.secret_access_key = None
 
         _s.session = boto3.Session(
+            botocore_session=__get_botocore_session(),
             profile_name=os.environ.get('AWS_PROFILE'),
             region_name=_s.creds.region)
 
@@ -159,6 +228,7 @@ def init_session() -> AwsSession:
         _s.creds.region = os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')
 
         _s.session = boto3.Session(
+            botocore_session=__get_botocore_session(),
             aws_access_key_id=_s.creds.access_key,
             aws_secret_access_key=_s.creds.secret_access_key,
             aws_session_token=_s.creds.session_token,
@@ -171,12 +241,94 @@ def init_session() -> AwsSession:
         _s.creds.region = os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')
 
         _s.session = boto3.Session(
+            botocore_session=__get_botocore_session(),
             aws_access_key_id=_s.creds.access_key,
             aws_secret_access_key=_s.creds.secret_access_key,
             region_name=_s.creds.region)
 
+    #
+    # Session.region_name is a property that walks the botocore resolution
+    # chain on every access, so cache it once on the AwsSession.
+    #
+    if _s.session is not None:
+        _s.region = _s.session.region_name
+
     return _s
 
+#
+# boto3 clients parse the full service model on construction, so cache them
+# per (session, service, region) instead of rebuilding one per helper call.
+#
+__client_cache = {}
+
+
+#
+# Shared client config: adaptive retries replace the ad-hoc retry loops we
+# used to wrap around throttled calls, and the larger connection pool lets
+# ThreadPoolExecutor callers overlap requests instead of queueing on the
+# default pool of 10.
+#
+_CLIENT_CONFIG = None
+
+
+def __client_config():
+    global _CLIENT_CONFIG
+    if _CLIENT_CONFIG is None:
+        import botocore.config
+        _CLIENT_CONFIG = botocore.config.Config(
+            retries={'mode': 'adaptive', 'max_attempts': 10},
+            max_pool_connections=int(os.environ.get('AWS_MAX_POOL', '50')),
+            tcp_keepalive=True,
+            connect_timeout=5,
+            read_timeout=30)
+    return _CLIENT_CONFIG
+
+
+def _get_client(session: AwsSession, service: str, region: typing.Optional[str] = None):
+    key = (id(session.session), service, region)
+    client = __client_cache.get(key)
+    if client is None:
+        client = session.session.client(service, region_name=region, config=__client_config())
+        __client_cache[key] = client
+    return client
+
+
+#
+# The default "cicd" session is memoized for the process lifetime so helpers
+# that each build their own _LazySession share one init_session() (and one
+# STS assume-role call) instead of paying it per helper call. It also keeps
+# the client and zone caches keyed on a single session identity.
+#
+__default_session = None
+
+
+def _default_session() -> AwsSession:
+    global __default_session
+    if __default_session is None:
+        __default_session = init_session()
+    return __default_session
+
+
+class _LazySession():
+    """
+    _LazySession
+
+    Stand-in for AwsSession that defers the init_session() credential dance
+    until a session attribute is actually touched. Helpers that only log the
+    session name or run entirely from explicit arguments never pay for
+    session construction.
+    """
+    name = "cicd"
+
+    def __init__(self):
+        self.__dict__['_real'] = None
+
+    def __getattr__(self, key):
+        if self.__dict__['_real'] is None:
+            self.__dict__['_real'] = _default_session()
+        return getattr(self.__dict__['_real'], key)
+
+
 def get_aws_account_id(session: typing.Optional[AwsSession] = None) -> str:
     """
     get_aws_account_id()
@@ -185,20 +337,22 @@ def get_aws_account_id(session: typing.Optional[AwsSession] = None) -> str:
 
     session will either be pre-created and sent in as argument, or one will be made for you.
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
 
     loggy.info(f"aws.get_aws_account_id(): BEGIN (using session named: {_s.name})")
 
+    from botocore.exceptions import ClientError
+
     try:
-        client = _s.session.client('sts')
+        client = _get_client(_s, 'sts')
         # response = client.get_access_key_info(AccessKeyId=_s.creds.access_key)
-        response = client.get_caller_identity()
-        if 'Account' not in response:
-            loggy.error("Error: Account ID not returned")
-    except Exception as e:
+        return client.get_caller_identity()['Account']
+    except KeyError:
+        loggy.error("Error: Account ID not returned")
+        raise
+    except ClientError as e:
         loggy.error("Error: " + str(e))
-
-    return response['Account']
+        raise
 
 
 def get_region(session: typing.Optional[AwsSession] = None) -> str:
@@ -209,11 +363,11 @@ def get_region(session: typing.Optional[AwsSession] = None) -> str:
 
     session will use a different session to build the client, default is global _sessions
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
 
     loggy.info(f"aws.get_region(): BEGIN (using session named: {_s.name})")
 
-    return _s.session.region_name
+    return _s.region
 
 
 def get_session(session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None):
@@ -226,12 +380,21 @@ def get_session(session: typing.Optional[AwsSession] = None, region: typing.Opti
 
     returns: boto3.Session() object
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
 
     loggy.info(f"aws.get_session(): BEGIN (using session named: {_s.name})")
     return _s.session
 
 
+#
+# The assembled env dict is memoized per session, keyed on the access key so
+# the cache invalidates if the credentials are ever refreshed. Repeated
+# subprocess helpers in one pipeline step then share the same env instead of
+# re-copying os.environ and re-reading credentials each call.
+#
+__session_env_cache = {}
+
+
 def get_session_env(session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None):
     """
     get_session_env()
@@ -242,16 +405,22 @@ def get_session_env(session: typing.Optional[AwsSession] = None, region: typing.
 
     returns: new os.environ.copy() modified with session credentials
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     loggy.info(f"aws.get_session(): BEGIN (using session named: {_s.name})")
 
+    key = (id(session), _s.creds.access_key)
+    cached = __session_env_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
     new_env = os.environ.copy()
     new_env['AWS_ACCESS_KEY_ID'] = _s.creds.access_key
     new_env['AWS_SECRET_ACCESS_KEY'] = _s.creds.secret_access_key
     new_env['AWS_SESSION_TOKEN'] = _s.creds.session_token
     new_env['AWS_DEFAULT_REGION'] = _s.creds.region
 
-    return new_env
+    __session_env_cache[key] = new_env
+    return dict(new_env)
 
 
 
@@ -272,12 +441,12 @@ def cloudfront_create_invalidation(dist: str, items: typing.Optional[list] = ["/
 
     returns invalidation_id (String)
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.cloudfront_create_invalidation(): BEGIN (using session named: {_s.name})")
 
     try:
-        client = _s.session.client('cloudfront', region_name=_r)
+        client = _get_client(_s, 'cloudfront', _r)
         response = client.create_invalidation(
             DistributionId=dist,
             InvalidationBatch={
@@ -285,7 +454,7 @@ def cloudfront_create_invalidation(dist: str, items: typing.Optional[list] = ["/
                     'Quantity': len(items),
                     'Items': items
                 },
-                'CallerReference': str(time.time()).replace(".", "")
+                'CallerReference': uuid.uuid4().hex
             }
         )
         invalidation_id = response['Invalidation']['Id']
@@ -309,13 +478,13 @@ def cloudfront_get_kvs_key(kvs_arn: str, kvs_key: str, session: typing.Optional[
 
     returns kvs_key_info (str) or None if the key is not found
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.cloudfront_get_kvs_key(): BEGIN (using session named: {_s.name})")
 
     value = None
     try:
-        client = _s.session.client('cloudfront-keyvaluestore', region_name=_r)
+        client = _get_client(_s, 'cloudfront-keyvaluestore', _r)
         response = client.get_key(
             KvsARN=kvs_arn,
             Key=kvs_key
@@ -340,13 +509,13 @@ def cloudfront_get_kvs_etag(kvs_arn: str, session: typing.Optional[AwsSession] =
     returns etag (str) or None if the KVS is not found
     """
 
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.cloudfront_get_kvs_etag(): BEGIN (using session named: {_s.name})")
 
     etag = None
     try:
-        client = _s.session.client('cloudfront-keyvaluestore', region_name=_r)
+        client = _get_client(_s, 'cloudfront-keyvaluestore', _r)
         response = client.describe_key_value_store(
             KvsARN=kvs_arn
         )
@@ -370,8 +539,8 @@ def cloudfront_update_kvs_key(kvs_arn: str, kvs_key: str, value: str, session: t
 
     returns True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.cloudfront_update_kvs_key(): BEGIN (using session named: {_s.name})")
 
     try:
@@ -380,7 +549,7 @@ def cloudfront_update_kvs_key(kvs_arn: str, kvs_key: str, value: str, session: t
             loggy.error("Error: ETag not found for KVS")
             return False
 
-        client = _s.session.client('cloudfront-keyvaluestore', region_name=_r)
+        client = _get_client(_s, 'cloudfront-keyvaluestore', _r)
         response = client.put_key(
             KvsARN=kvs_arn,
             Key=kvs_key,
@@ -399,6 +568,12 @@ def cloudfront_update_kvs_key(kvs_arn: str, kvs_key: str, value: str, session: t
 ECR UTILS
 """
 
+#
+# Parses "<account>.dkr.ecr.<region>.amazonaws.com/<repo>:<tag>" in one pass.
+# The account/region prefix and the tag are both optional.
+#
+_ECR_RE = re.compile(r'^(?:(\d+)\.dkr\.ecr\.([^.]+)\.amazonaws\.com/)?(.+?)(?::([^:/]+))?$')
+
 
 def ecr_get_account_id(session: typing.Optional[AwsSession] = None):
     """
@@ -409,7 +584,7 @@ def ecr_get_account_id(session: typing.Optional[AwsSession] = None):
     if ECR_ACCOUNT_ID:
         return ECR_ACCOUNT_ID
 
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     return get_aws_account_id(_s)
 
 
@@ -420,8 +595,8 @@ def ecr_get_region(session: typing.Optional[AwsSession] = None):
     Determine the ECR region. Fallback to the session account.    
     """
     if not ECR_ACCOUNT_REGION:
-        _s = init_session() if session is None else session
-        return _s.session.region_name
+        _s = _LazySession() if session is None else session
+        return _s.region
 
     return ECR_ACCOUNT_REGION
 
@@ -452,7 +627,7 @@ def ecr_login(registry_id: typing.Optional[str] = None, session: typing.Optional
     """
     loggy.info("aws.ecr_login(): BEGIN")
 
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
     _reg = ecr_get_account_id(_s) if registry_id is None else registry_id
 
@@ -460,7 +635,7 @@ def ecr_login(registry_id: typing.Optional[str] = None, session: typing.Optional
 
     try:
         loggy.info(f"aws.ecr_login(): registry_id ({_reg}) region ({_r})")
-        client = _s.session.client('ecr', region_name=_r)
+        client = _get_client(_s, 'ecr', _r)
         response = client.get_authorization_token(registryIds=[_reg])
     except Exception as e:
         loggy.error("Error: " + str(e))
@@ -491,7 +666,7 @@ def ecr_generate_build_fqcn(container: str, registry_id: typing.Optional[str] =
 
     Returns: String container and String tag (None if tag doesn't exist)
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     loggy.info(f"aws.ecr_generate_build_fqcn(): BEGIN (using session named: {_s.name})")
     return ecr_generate_fqcn(container=container, registry_id=registry_id, session=_s, region=region)
 
@@ -507,24 +682,21 @@ def ecr_generate_fqcn(container: str, session: typing.Optional[AwsSession] = Non
 
     Returns: String container and String tag (None if tag doesn't exist)
     """
-    if "dkr.ecr" in container:
+    _m = _ECR_RE.match(container)
+    if _m.group(1):
         loggy.info(f"aws.ecr_generate_fqcn(): ECR URL already exists: {container}. Stripping container and creating a new ECR URL")
-        container = ecr_strip_container_name(container=container)
-        # return container.split(':')
+    _repo, _tag = _m.group(3), _m.group(4)
 
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
     _reg = ecr_get_account_id(_s) if registry_id is None else registry_id
 
     loggy.info(f"aws.ecr_generate_fqcn(): BEGIN (using session named: {_s.name})")
 
-    loggy.info(f"aws.ecr_generate_fqcn(): Generated ECR URL: {_reg}.dkr.ecr.{_r}.amazonaws.com/{container}")
+    _fqcn = f"{_reg}.dkr.ecr.{_r}.amazonaws.com/{_repo}"
+    loggy.info(f"aws.ecr_generate_fqcn(): Generated ECR URL: {_fqcn}")
 
-    _ret = f"{_reg}.dkr.ecr.{_r}.amazonaws.com/{container}".split(':')
-    if len(_ret) < 2:
-        return _ret[0], None
-
-    return _ret[0], _ret[1]
+    return _fqcn, _tag
 
 
 def ecr_push(container: str, tag: str, tag_list: typing.Optional[list] = None, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> bool:
@@ -540,23 +712,28 @@ def ecr_push(container: str, tag: str, tag_list: typing.Optional[list] = None, s
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     loggy.info(f"aws.ecr_push(): BEGIN (using session named: {_s.name})")
     ecr_login(session=_s)
 
     #
     # First, let's add any additional tags from tag_list to the docker image
     #
-    for _tag in tag_list:
-        loggy.info(f"aws.ecr_push(): Adding Tag {_tag} to {container}")
-        if not _docker("tag", f"{container}:{tag}", f"{container}:{_tag}"):
+    _tags = [tag] + list(tag_list or [])
+    if _tags[1:]:
+        loggy.info(f"aws.ecr_push(): Adding Tags {_tags[1:]} to {container}")
+        if not _docker_batch([["tag", f"{container}:{tag}", f"{container}:{_tag}"] for _tag in _tags[1:]]):
             return False
 
     #
-    # Push all tags at once to save time in pipelines
+    # Push each tag concurrently to save time in pipelines. ECR checks layer
+    # existence server-side, so parallel pushes mostly just send manifests.
     #
-    loggy.info(f"aws.ecr_push(): Pushing {container} with all tags to ECR.")
-    if not _docker("push", container, "--all-tags"):
+    loggy.info(f"aws.ecr_push(): Pushing {container} with tags ({_tags}) to ECR.")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _t: _docker("push", f"{container}:{_t}"), _tags))
+
+    if not all(results):
         return False
 
     return True
@@ -572,12 +749,11 @@ def ecr_strip_container_name(container: str) -> str:
 
     Returns: String containing just container like "mirrored/amazoncorretto"
     """
-    if 'amazonaws' in container:
-        _new = container.split('/')
-        del _new[0]
-        return '/'.join(_new)
-
-    return container
+    #
+    # Single scan of the string, no list allocation.
+    #
+    _i = container.find('.amazonaws.com/')
+    return container[_i + len('.amazonaws.com/'):] if _i != -1 else container
 
 
 def ecr_get_manifest(container: str, tag: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> str:
@@ -593,11 +769,11 @@ def ecr_get_manifest(container: str, tag: str, session: typing.Optional[AwsSessi
 
     Returns: String containing image manifest
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
     loggy.info(f"aws.ecr_get_manifest(): BEGIN (using session named: {_s.name})")
 
-    client = _s.session.client('ecr', region_name=_r)
+    client = _get_client(_s, 'ecr', _r)
 
     manifest = None
     try:
@@ -636,11 +812,11 @@ def ecr_put_image(container: str, tag: str, manifest: str, session: typing.Optio
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
     loggy.info(f"aws.ecr_put_image(): BEGIN (using session named: {_s.name})")
 
-    client = _s.session.client('ecr', region_name=_r)
+    client = _get_client(_s, 'ecr', _r)
 
     try:
         client.put_image(
@@ -671,7 +847,7 @@ def ecr_tag_to_build(container: str, tag_list: list, session: typing.Optional[Aw
     container: String containing existing remote container with tag "container:tag"
     tag_list: String List containing new tags to add to the local container
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
 
     loggy.info(f"aws.ecr_tag_to_build(): BEGIN (using session named: {_s.name})")
@@ -694,7 +870,7 @@ def ecr_tag(container: str, tag: str, session: typing.Optional[AwsSession] = Non
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
 
     loggy.info(f"aws.ecr_tag(): BEGIN (using session named: {_s.name})")
@@ -728,13 +904,13 @@ def ecr_tag_exists(container: str, tag: str, session: typing.Optional[AwsSession
     Returns: True/False and the full image tag if it exists
 
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     _r = ecr_get_region(_s) if region is None else region
 
     loggy.info(f"aws.ecr_tag_exists(): BEGIN (using session named: {_s.name})")
 
     loggy.info(f"aws.ecr_tag_exists(): Checking if {container} has tag {tag}")
-    client = _s.session.client('ecr', region_name=_r)
+    client = _get_client(_s, 'ecr', _r)
     response = client.list_images(registryId=ecr_get_account_id(_s), repositoryName=ecr_strip_container_name(container))
 
     for image in response['imageIds']:
@@ -769,8 +945,8 @@ def ecs_deploy_v2(clusterArn: str, serviceArn: str, containerName: typing.Option
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecsDeploy_v2(): BEGIN (using session named: {_s.name})")
 
     _TAG = tag if tag is not None else _get_version()
@@ -783,8 +959,10 @@ def ecs_deploy_v2(clusterArn: str, serviceArn: str, containerName: typing.Option
     If the _CLUSTER_ARN or _SERVICE_ARN are not in ARN format, consider them SSM Param names
     and use them to grab the ARNS out of SSM Params
     """
-    _CLUSTER = _CLUSTER_ARN if ':' in _CLUSTER_ARN else ssm_get_parameter(name=_CLUSTER_ARN, session=_s, region=_r)
-    _SERVICE = _SERVICE_ARN if ':' in _SERVICE_ARN else ssm_get_parameter(name=_SERVICE_ARN, session=_s, region=_r)
+    _ssm_names = [n for n in (_CLUSTER_ARN, _SERVICE_ARN) if not n.startswith('arn:aws:')]
+    _ssm_values = ssm_get_parameters(names=_ssm_names, session=_s, region=_r) if _ssm_names else {}
+    _CLUSTER = _CLUSTER_ARN if _CLUSTER_ARN.startswith('arn:aws:') else _ssm_values.get(_CLUSTER_ARN)
+    _SERVICE = _SERVICE_ARN if _SERVICE_ARN.startswith('arn:aws:') else _ssm_values.get(_SERVICE_ARN)
 
     """
     go get the entire task definition for a service by name (might need the cluster too)
@@ -807,7 +985,7 @@ def ecs_deploy_v2(clusterArn: str, serviceArn: str, containerName: typing.Option
     after: docker.devops.rekor.io/blue/api:$newVersion
     """
     new_task_definition = ecs_set_new_image_in_task_def(task_def=current_task_definition, version=new_tag, containerName=containerName)
-    loggy.info(f"ecsDeploy_v2(): New Task Definition: {str(new_task_definition)}")
+    loggy.debug("ecsDeploy_v2(): New Task Definition: %s", new_task_definition)
 
     """
     Go register the next task def
@@ -840,6 +1018,51 @@ def ecs_deploy_v2(clusterArn: str, serviceArn: str, containerName: typing.Option
     return True
 
 
+class _VersionStore():
+    """
+    _VersionStore()
+
+    Version params live in either SSM or Secrets Manager depending on the
+    application's CDK. Remember which backend answered first so every later
+    get/put in the same deploy goes straight to the right one instead of
+    retrying SSM and falling back each time.
+    """
+
+    def __init__(self, name: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None):
+        self.name = name
+        self._kind = None
+        self._s = _LazySession() if session is None else session
+        self._r = region
+
+    def get(self) -> str:
+        """
+        Get the stored version, trying SSM first unless we already know it lives in Secrets.
+        """
+        if self._kind != 'secret':
+            value = ssm_get_parameter(name=self.name, session=self._s, region=self._r)
+            if value:
+                self._kind = 'ssm'
+                return value
+        value = secrets_get_secret_string(name=self.name, session=self._s, region=self._r)
+        if value:
+            self._kind = 'secret'
+            return value
+        raise Exception(f"aws._VersionStore(): Ensure your CDK creates either an SSM or a Secret at {self.name} and that GoCD has read/write access.")
+
+    def put(self, value: str):
+        """
+        Store a version in whichever backend holds it.
+        """
+        if self._kind != 'secret':
+            if ssm_put_parameter(name=self.name, value=value, session=self._s, region=self._r):
+                self._kind = 'ssm'
+                return
+        if secrets_put_secret_string(name=self.name, value=value, session=self._s, region=self._r):
+            self._kind = 'secret'
+            return
+        raise Exception(f"aws._VersionStore(): Ensure your CDK creates either an SSM or a Secret at {self.name} and that GoCD has read/write access.")
+
+
 def ecs_deploy(clusterArn: str, serviceArn: str, tag: typing.Optional[str] = None, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> bool:
     """
     ecsDeploy.py
@@ -858,8 +1081,8 @@ def ecs_deploy(clusterArn: str, serviceArn: str, tag: typing.Optional[str] = Non
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecsDeploy(): BEGIN (using session named: {_s.name})")
 
     _TAG = tag if tag is not None else _get_version()
@@ -870,8 +1093,10 @@ def ecs_deploy(clusterArn: str, serviceArn: str, tag: typing.Optional[str] = Non
     If the _CLUSTER_ARN or _SERVICE_ARN are not in ARN format, consider them SSM Param names
     and use them to grab the ARNS out of SSM Params
     """
-    _CLUSTER = _CLUSTER_ARN if ':' in _CLUSTER_ARN else ssm_get_parameter(name=_CLUSTER_ARN, session=_s, region=_r)
-    _SERVICE = _SERVICE_ARN if ':' in _SERVICE_ARN else ssm_get_parameter(name=_SERVICE_ARN, session=_s, region=_r)
+    _ssm_names = [n for n in (_CLUSTER_ARN, _SERVICE_ARN) if not n.startswith('arn:aws:')]
+    _ssm_values = ssm_get_parameters(names=_ssm_names, session=_s, region=_r) if _ssm_names else {}
+    _CLUSTER = _CLUSTER_ARN if _CLUSTER_ARN.startswith('arn:aws:') else _ssm_values.get(_CLUSTER_ARN)
+    _SERVICE = _SERVICE_ARN if _SERVICE_ARN.startswith('arn:aws:') else _ssm_values.get(_SERVICE_ARN)
 
     """
     go get the entire task definition for a service by name (might need the cluster too)
@@ -888,17 +1113,7 @@ def ecs_deploy(clusterArn: str, serviceArn: str, tag: typing.Optional[str] = Non
     if found, return the value which will be an ssm param arn
     """
     version_secret_param_arn = ecs_get_version_param_name_from_task_def(task_def=current_task_definition)
-
-    """
-    Get the currently deployed version number. We try to pull from ssm first, then fall back to secrets
-    """
-    loggy.info("aws.ecsDeploy(): Attempting to pull ssm version param first")
-    old_version = ssm_get_parameter(name=version_secret_param_arn, session=_s, region=_r)
-    if not old_version:
-        loggy.info("aws.ecsDeploy(): Attempting to pull secret version instead.")
-        old_version = secrets_get_secret_string(name=version_secret_param_arn, session=_s, region=_r)
-        if not old_version:
-            raise Exception(f"aws.ecsDeploy(): Ensure your CDK creates either an SSM or a Secret at {version_secret_param_arn} and that GoCD has read/write access.")
+    version_store = _VersionStore(name=version_secret_param_arn, session=_s, region=_r)
 
     """
     set the new version provided by the caller
@@ -906,52 +1121,54 @@ def ecs_deploy(clusterArn: str, serviceArn: str, tag: typing.Optional[str] = Non
     new_version = _TAG
 
     """
-    This iterates over the containers again to set
+    The old-version lookup has no dependency on the task-def rewrite/register,
+    so overlap the two instead of running every AWS call back to back.
+
+    The rewrite iterates over the containers again to set
     the new image in the container where
     we simply get the old image and replace the :{tag}
     before: docker.devops.rekor.io/blue/api:12345
     after: docker.devops.rekor.io/blue/api:$newVersion
     """
-    new_task_definition = ecs_set_new_image_in_task_def(task_def=current_task_definition, version=new_version)
-    loggy.info(f"ecsDeploy(): New Task Definition: {str(new_task_definition)}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _old_version_future = executor.submit(version_store.get)
 
-    """
-    Go register the next task def
-    there should now be a new version of the task def
-    """
-    new_task_definition_arn = ecs_register_task_definition_revision(task_def=new_task_definition, session=_s, region=_r)
+        new_task_definition = ecs_set_new_image_in_task_def(task_def=current_task_definition, version=new_version)
+        loggy.debug("ecsDeploy(): New Task Definition: %s", new_task_definition)
+
+        """
+        Go register the next task def
+        there should now be a new version of the task def
+        """
+        new_task_definition_arn = ecs_register_task_definition_revision(task_def=new_task_definition, session=_s, region=_r)
+
+        old_version = _old_version_future.result()
 
     if not new_task_definition_arn:
         return False
 
     """
-    update the ssm param with the new tag.
-    This function should fail gracefully as not all appilcations use an SSM param
-    to store its version. Scout uses the git commit hash for version awareness.
-    """
-    loggy.info("aws.ecsDeploy(): Attempting to push ssm version param first")
-    if not ssm_put_parameter(name=version_secret_param_arn, value=_TAG, session=_s, region=_r):
-        loggy.info("aws.ecsDeploy(): Attempting to push secret version param instead")
-        if not secrets_put_secret_string(name=version_secret_param_arn, value=_TAG, session=_s, region=_r):
-            raise Exception(f"aws.ecsDeploy(): Ensure your CDK creates either an SSM or a Secret at {version_secret_param_arn} and that GoCD has read/write access.")
-
-    """
-    deploy new task def to the service
+    push the new version param and deploy the new task def to the service.
+    The two calls have no data dependency, so run them concurrently to keep
+    one full AWS round-trip off the critical path.
     """
-    ecs_deploy_new_task_definition(cluster=_CLUSTER, service=_SERVICE, task_def_arn=new_task_definition_arn, session=_s, region=_r)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _version_future = executor.submit(version_store.put, _TAG)
+        _deploy_future = executor.submit(ecs_deploy_new_task_definition, cluster=_CLUSTER, service=_SERVICE, task_def_arn=new_task_definition_arn, session=_s, region=_r)
+        _version_future.result()
+        _deploy_future.result()
 
     deploy_status = ecs_wait_services_stable(cluster=_CLUSTER, service=_SERVICE, session=_s, region=_r)
     if not deploy_status:
         loggy.info("ecsDeploy(): Deploy FAILED! Rolling back to original task def!")
 
         # Roll back procedures by rolling back the version param and setting the service back to the original task def
-        loggy.info("aws.ecsDeploy(): Attempting to push ssm version param first")
-        if not ssm_put_parameter(name=version_secret_param_arn, value=old_version, session=_s, region=_r):
-            loggy.info("aws.ecsDeploy(): Attempting to push secret version param instead")
-            if not secrets_put_secret_string(name=version_secret_param_arn, value=old_version, session=_s, region=_r):
-                raise Exception(f"aws.ecsDeploy(): Ensure your CDK creates either an SSM or a Secret at {version_secret_param_arn} and that GoCD has read/write access.")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            _version_future = executor.submit(version_store.put, old_version)
+            _deploy_future = executor.submit(ecs_deploy_new_task_definition, cluster=_CLUSTER, service=_SERVICE, task_def_arn=current_task_definition_arn, session=_s, region=_r)
+            _version_future.result()
+            _deploy_future.result()
 
-        ecs_deploy_new_task_definition(cluster=_CLUSTER, service=_SERVICE, task_def_arn=current_task_definition_arn, session=_s, region=_r)
         deploy_status = ecs_wait_services_stable(cluster=_CLUSTER, service=_SERVICE, session=_s, region=_r)
         if not deploy_status:
             raise Exception("aws.ecsDeploy(): Rolling back to original task def failed!")
@@ -975,27 +1192,68 @@ def ecs_get_latest_task_definition_arn(cluster: str, service: str, session: typi
 
     Returns: String containing task def arn
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_get_latest_task_definition_arn(): BEGIN (using session named: {_s.name})")
 
     loggy.info(f"aws.ecs_get_latest_task_definition_arn(): Searching for latest task_definition_arn in cluster/service ({cluster} / {service})")
 
-    task_def_arn = None
+    task_def_arns = ecs_get_latest_task_definition_arns(cluster=cluster, services=[service], session=_s, region=_r)
+    return task_def_arns.get(service) or next(iter(task_def_arns.values()), None)
+
+
+def ecs_get_latest_task_definition_arns(cluster: str, services: list, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> dict:
+    """
+    ecs_get_latest_task_definition_arns()
+
+    Get the latest task definition arns for a batch of services in a particular
+    cluster. DescribeServices accepts up to 10 services per call, so the list is
+    resolved in batches of 10 rather than one round-trip per service.
+
+    cluster: String containing ECS Cluster ARN
+    services: List of Strings containing ECS Service ARNs
+
+    Returns: dict of service arn -> task def arn
+    """
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
+    loggy.info(f"aws.ecs_get_latest_task_definition_arns(): BEGIN (using session named: {_s.name})")
+
+    task_def_arns = {}
     try:
-        client = _s.session.client('ecs', region_name=_r)
-        response = client.describe_services(
-            cluster=cluster,
-            services=[
-                service
-            ]
-        )
-        task_def_arn = response['services'][0]['taskDefinition']
+        client = _get_client(_s, 'ecs', _r)
+        for i in range(0, len(services), 10):
+            response = client.describe_services(
+                cluster=cluster,
+                services=services[i:i + 10]
+            )
+            for svc in response['services']:
+                task_def_arns[svc['serviceArn']] = svc['taskDefinition']
     except Exception as e:
-        loggy.error(f"aws.ecs_get_latest_task_definition_arn(): Error: {str(e)}")
+        loggy.error(f"aws.ecs_get_latest_task_definition_arns(): Error: {str(e)}")
         raise
 
-    return task_def_arn
+    return task_def_arns
+
+
+#
+# Task definitions are immutable per ARN (the revision number is part of the
+# arn), so describe each ARN at most once per process.
+#
+__task_def_cache = {}
+
+
+def _taskdef_family_rev(task_def_arn: str) -> tuple:
+    """
+    _taskdef_family_rev()
+
+    Parse the family and revision out of a task definition ARN without a
+    describe call. ARNs follow arn:aws:ecs:region:acct:task-definition/family:rev
+
+    Returns: (family, revision) - revision is None if the ARN has no revision
+    """
+    family, _, rev = task_def_arn.rpartition('/')[2].rpartition(':')
+    return (family, rev) if family else (rev, None)
 
 
 def ecs_get_task_definition_from_arn(task_def_arn: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> dict:
@@ -1008,20 +1266,30 @@ def ecs_get_task_definition_from_arn(task_def_arn: str, session: typing.Optional
 
     Returns: dict containing enough of the task def to clone it
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_get_task_definition_from_arn(): BEGIN (using session named: {_s.name})")
 
+    #
+    # Callers mutate the returned dict, so cache hits hand back a copy.
+    #
+    if ':task-definition/' in task_def_arn and task_def_arn in __task_def_cache:
+        loggy.info(f"aws.ecs_get_task_definition_from_arn(): Returning cached task definition for: {task_def_arn}")
+        return copy.deepcopy(__task_def_cache[task_def_arn])
+
     loggy.info(f"aws.ecs_get_task_definition_from_arn(): Reading in full task definition from: {task_def_arn}")
 
     try:
-        client = _s.session.client('ecs', region_name=_r)
+        client = _get_client(_s, 'ecs', _r)
         response = client.describe_task_definition(
             taskDefinition=task_def_arn
         )
 
         task_def = response['taskDefinition']
-        loggy.info(f"aws.ecs_get_task_definition_from_arn(): DUMPING TASK DEF: {str(task_def)}")
+        loggy.debug("aws.ecs_get_task_definition_from_arn(): DUMPING TASK DEF: %s", task_def)
+
+        if ':task-definition/' in task_def_arn:
+            __task_def_cache[task_def_arn] = copy.deepcopy(task_def)
 
     except Exception as e:
         loggy.error(f"aws.ecs_get_task_definition_from_arn(): Error: {str(e)}")
@@ -1050,17 +1318,6 @@ def ecs_get_task_definition_from_arn(task_def_arn: str, session: typing.Optional
     return task_def
 
 
-def __ecs_check_version_in_secrets(secrets: dict) -> str:
-    """
-    """
-    param_name = None
-    for secret in secrets:
-        if secret.get('name') and 'VERSION' in secret['name']:
-            param_name = secret.get('valueFrom')
-            break
-    return param_name
-
-
 def ecs_get_version_param_name_from_task_def(task_def: dict) -> str:
     """
     ecs_get_version_param_name_from_task_def()
@@ -1071,20 +1328,16 @@ def ecs_get_version_param_name_from_task_def(task_def: dict) -> str:
 
     Return: String containing version SSM param name
     """
-    loggy.info(f"aws.ecs_get_version_param_name_from_task_def(): Searching for VERSION ssm parameter arn in containers inside of {task_def}")
+    loggy.info("aws.ecs_get_version_param_name_from_task_def(): Searching for VERSION ssm parameter arn in containers")
+    loggy.debug("aws.ecs_get_version_param_name_from_task_def(): task_def: %s", task_def)
 
-    param_name = None
     if not task_def.get('containerDefinitions'):
         raise Exception("aws.ecs_get_version_param_name_from_task_def(): Could not locate containerDefinitions inside of the task_def dict")
-        return param_name
 
-    for container in task_def['containerDefinitions']:
-        if container.get('secrets'):
-            param_name = __ecs_check_version_in_secrets(container['secrets'])
-            if param_name:
-                break
-
-    return param_name
+    return next((secret.get('valueFrom')
+                 for container in task_def['containerDefinitions']
+                 for secret in container.get('secrets') or []
+                 if 'VERSION' in (secret.get('name') or '')), None)
 
 
 # def ecs_save_task_def_to_json_file(current_task_definition, old_task_definition_file_name):
@@ -1111,20 +1364,27 @@ def ecs_set_new_image_in_task_def(task_def: dict, version: str, containerName: t
     if not task_def.get('containerDefinitions'):
         raise Exception("aws.ecs_set_new_image_in_task_def(): containerDefinitions not found in task_def.")
 
+    #
+    # Hoist the case folding and the log-level check out of the loop so
+    # sidecar-heavy task defs don't pay for formatting on every container.
+    #
+    _container_name = containerName.lower() if containerName else None
+    _log_info = logging.getLogger().isEnabledFor(logging.INFO)
+
     for container in task_def['containerDefinitions']:
         if not container.get('image'):
             raise Exception("aws.ecs_set_new_image_in_task_def(): container image value not found in returned list.")
-            return {}
 
-        _image, _original_image_version = container['image'].split(':')
-        loggy.info(f"aws.ecs_set_new_image_in_task_def(): Image: {_image} and original image version: {_original_image_version}")
-        if containerName and containerName.lower() in _image.lower():
-            _image = f"{_image}:{version}"
-            loggy.info(f"aws.ecs_set_new_image_in_task_def(): Changing image version ({_original_image_version}) to ({version}) for container named ({container['name']}): new image is ${_image}")
-        else:
-            loggy.info(f"aws.ecs_set_new_image_in_task_def(): Keeping original image version ({_original_image_version}) for container named ({container['name']}): new image is ${_image}")
-            _image = f"{_image}:{_original_image_version}"
-        container['image'] = _image
+        _image, _, _original_image_version = container['image'].rpartition(':')
+        if not _container_name or _container_name not in _image.lower():
+            #
+            # Non-matching containers keep their existing image untouched.
+            #
+            continue
+
+        if _log_info:
+            loggy.info(f"aws.ecs_set_new_image_in_task_def(): Changing image version ({_original_image_version}) to ({version}) for container named ({container['name']}): new image is {_image}:{version}")
+        container['image'] = f"{_image}:{version}"
 
     return task_def
 
@@ -1139,48 +1399,38 @@ def ecs_register_task_definition_revision(task_def: dict, session: typing.Option
 
     Returns: dict of new task_def
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_register_new_task_definition(): BEGIN (using session named: {_s.name})")
 
     loggy.info("aws.ecs_register_new_task_definition(): Registering new task definition.")
 
     try:
-        client = _s.session.client('ecs', region_name=_r)
+        client = _get_client(_s, 'ecs', _r)
+
+        kwargs = {
+            'family': task_def['family'],
+            'containerDefinitions': task_def['containerDefinitions'],
+            'volumes': task_def['volumes'],
+            'taskRoleArn': task_def.get('taskRoleArn', None),
+            'executionRoleArn': task_def.get('executionRoleArn', None),
+            'requiresCompatibilities': task_def['requiresCompatibilities'],
+            'networkMode': task_def['networkMode'],
+            'tags': task_def.get('tags', [{ "key": "cicd", "value": "deployed via cicd"}])
+        }
 
         #
-        # 2023-07-10 TAW - Adding runtimePlatform now that we can choose between ARM64 and x86_64
+        # 2023-07-10 TAW - Fargate tasks also carry sizing and runtimePlatform
+        # now that we can choose between ARM64 and x86_64
         #
-        isFargate = False
-        for c in task_def['requiresCompatibilities']:
-            if 'FARGATE' in c:
-                isFargate = True
-
-        if isFargate:
-            response = client.register_task_definition(
-                family=task_def['family'],
-                containerDefinitions=task_def['containerDefinitions'],
-                volumes=task_def['volumes'],
-                taskRoleArn=task_def.get('taskRoleArn', None),
-                executionRoleArn=task_def.get('executionRoleArn', None),
-                requiresCompatibilities=task_def['requiresCompatibilities'],
-                networkMode=task_def['networkMode'],
-                cpu=task_def.get('cpu', ''),
-                memory=task_def.get('memory', ''),
-                runtimePlatform=task_def.get('runtimePlatform', {}),
-                tags=task_def.get('tags', [{ "key": "cicd", "value": "deployed via cicd"}])
-            )
-        else:
-            response = client.register_task_definition(
-                family=task_def['family'],
-                containerDefinitions=task_def['containerDefinitions'],
-                volumes=task_def['volumes'],
-                taskRoleArn=task_def.get('taskRoleArn', None),
-                executionRoleArn=task_def.get('executionRoleArn', None),
-                requiresCompatibilities=task_def['requiresCompatibilities'],
-                networkMode=task_def['networkMode'],
-                tags=task_def.get('tags', [{ "key": "cicd", "value": "deployed via cicd"}])
-            )
+        if 'FARGATE' in task_def.get('requiresCompatibilities', ()):
+            kwargs.update({
+                'cpu': task_def.get('cpu', ''),
+                'memory': task_def.get('memory', ''),
+                'runtimePlatform': task_def.get('runtimePlatform', {})
+            })
+
+        response = client.register_task_definition(**kwargs)
 
         task_def = response['taskDefinition']['taskDefinitionArn']
     except Exception as e:
@@ -1202,14 +1452,14 @@ def ecs_deploy_new_task_definition(cluster: str, service: str, task_def_arn: str
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_deploy_new_task_definition(): BEGIN (using session named: {_s.name})")
 
     loggy.info(f"aws.ecs_deploy_new_task_definition(): Deploying task defintion ({task_def_arn}) to cluster ({cluster} / service ({service}).")
 
     try:
-        client = _s.session.client('ecs', region_name=_r)
+        client = _get_client(_s, 'ecs', _r)
         client.update_service(
             cluster=cluster,
             service=service,
@@ -1224,52 +1474,45 @@ def ecs_deploy_new_task_definition(cluster: str, service: str, task_def_arn: str
     return True
 
 
-def ecs_wait_services_stable(cluster: str, service: str, wait_time: typing.Optional[int] = 10, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> bool:
+def ecs_wait_services_stable(cluster: str, service: str, wait_time: typing.Optional[int] = 10, delay: typing.Optional[int] = 15, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> bool:
     """
     ecs_wait_services_stable()
 
     Wait up to {wait_time} minutes for ECS services to become stable.
-    NOTE: Ecs waiter.wait will wait for up to 10 minute. So the wait_time will be divided by 10m and rounded for X number of 10m attempts.
 
     cluster: String containing cluster arn
     service: String containing service arn
     wait_time: (Optional) Integer specifying wait time in minutes. Default is 10m
+    delay: (Optional) Integer specifying seconds between polls. Default is 15s
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_wait_services_stable(): BEGIN (using session named: {_s.name})")
 
     loggy.info(f"aws.ecs_wait_services_stable(): Waiting for services to become stable on cluster ({cluster} / service ({service}).")
 
     #
-    # Each waiter only waits for up to 10 minutes
+    # Let the waiter handle the full wait_time itself instead of wrapping the
+    # default 10 minute waiter in an outer retry loop.
     #
-    wait_attempts = round(wait_time/10)
-    attempt = 0
-    while True:
-        try:
-            client = _s.session.client('ecs', region_name=_r)
-            waiter = client.get_waiter('services_stable')
-
-            waiter.wait(
-                cluster=cluster,
-                services=[
-                    service
-                ])
-
-            # If we get here, we can break out of the while loop...
-            break
-        except Exception as e:
-            loggy.info(f"aws.ecs_wait_services_stable(): The services have not become stable yet: {str(e)}")
-
-            attempt = attempt + 1
-            if attempt >= wait_attempts:
-                loggy.info(f"aws.ecs_wait_services_stable(): Too many attempts. Failing.")
-                return False               
-
-            loggy.info(f"aws.ecs_wait_services_stable(): Continuing wait for attempt # {attempt}")
+    max_attempts = max(1, int(wait_time * 60 / delay))
+    client = _get_client(_s, 'ecs', _r)
+    waiter = client.get_waiter('services_stable')
+    try:
+        waiter.wait(
+            cluster=cluster,
+            services=[
+                service
+            ],
+            WaiterConfig={
+                'Delay': delay,
+                'MaxAttempts': max_attempts
+            })
+    except Exception as e:
+        loggy.info(f"aws.ecs_wait_services_stable(): The services did not become stable in time: {str(e)}")
+        return False
 
     return True
 
@@ -1284,14 +1527,14 @@ def ecs_deregister_task_def(task_def_arn: str, session: typing.Optional[AwsSessi
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.ecs_deregister_task_def(): BEGIN (using session named: {_s.name})")
 
     loggy.info(f"aws.ecs_deregister_task_def(): Deregistering task definition: {task_def_arn}")
 
     try:
-        client = _s.session.client('ecs', region_name=_r)
+        client = _get_client(_s, 'ecs', _r)
         response = client.deregister_task_definition(
             taskDefinition=task_def_arn
         )
@@ -1309,8 +1552,94 @@ def ecs_deregister_task_def(task_def_arn: str, session: typing.Optional[AwsSessi
 S3 Utils
 """
 
+#
+# Shared transfer tuning for all native S3 up/downloads. TransferConfig makes
+# boto3 do concurrent multipart transfers in-process, replacing the old
+# `aws s3 ...` subprocess (which paid a cold interpreter start per call).
+#
+_S3_TRANSFER_CONFIG = None
+
+
+def __s3_transfer_config():
+    global _S3_TRANSFER_CONFIG
+    if _S3_TRANSFER_CONFIG is None:
+        from boto3.s3.transfer import TransferConfig
+        _S3_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, max_concurrency=10, use_threads=True)
+    return _S3_TRANSFER_CONFIG
+
+
+def __s3_bucket_name(s3_bucket: str) -> str:
+    """
+    Strip the s3:// scheme that callers historically passed to the aws cli.
+    """
+    return s3_bucket[len('s3://'):] if s3_bucket.startswith('s3://') else s3_bucket
+
+
+def __s3_extra_args(s3_metadata: typing.Optional[str] = None,
+                    s3_cache_control: typing.Optional[str] = None,
+                    s3_content_type: typing.Optional[str] = None) -> dict:
+    """
+    Convert the aws-cli style flag values into boto3 ExtraArgs.
+    """
+    extra_args = {}
+    if s3_metadata:
+        # Same "Key1=Value1,Key2=Value2" format the aws cli --metadata flag takes
+        metadata = {}
+        for pair in s3_metadata.split(','):
+            key, _, value = pair.partition('=')
+            if key:
+                metadata[key.strip()] = value.strip()
+        extra_args['Metadata'] = metadata
+    if s3_cache_control:
+        extra_args['CacheControl'] = s3_cache_control
+    if s3_content_type:
+        extra_args['ContentType'] = s3_content_type
+    return extra_args
+
+
+def __s3_upload_args(local_path: str, extra_args: dict) -> dict:
+    """
+    Per-file ExtraArgs for an upload. The aws cli guessed Content-Type from
+    each file's extension; boto3's upload_file does not (everything lands as
+    binary/octet-stream), so add the guess unless the caller pinned an
+    explicit type.
+    """
+    if 'ContentType' in extra_args:
+        return extra_args
+    content_type, _ = mimetypes.guess_type(local_path)
+    if content_type is None:
+        return extra_args
+    return {**extra_args, 'ContentType': content_type}
+
+
+def __s3_walk_local(files: str) -> dict:
+    """
+    Map relative object keys -> local paths for a file or directory tree.
+    """
+    local_files = {}
+    if os.path.isdir(files):
+        for root, _dirs, names in os.walk(files):
+            for name in names:
+                full = os.path.join(root, name)
+                local_files[os.path.relpath(full, files).replace(os.sep, '/')] = full
+    else:
+        local_files[os.path.basename(files)] = files
+    return local_files
+
 
-def s3_sync(s3_bucket: str, 
+def __s3_strip_members(tar):
+    """
+    Drop the leading path component from each tar member (tar --strip-components=1).
+    """
+    for member in tar:
+        _, _, stripped = member.name.partition('/')
+        if not stripped:
+            continue
+        member.name = stripped
+        yield member
+
+
+def s3_sync(s3_bucket: str,
             s3_path: str, 
             files: str, 
             no_delete: typing.Optional[bool] = False, 
@@ -1323,40 +1652,68 @@ def s3_sync(s3_bucket: str,
     s3_sync()
 
     Authenticate against S3 in the current environment/account and sync files.
+    Runs natively on boto3 (no aws cli subprocess): lists the remote prefix
+    once, uploads only new/changed files and optionally deletes remote extras.
 
     s3_bucket: the bucket to sync files into. This should exist in the account you're pipeline runs under.
     s3_path: the path inside of the artifactory s3 bucket to place files
     files: a string containing either a single file or a folder containing all files you want pushed.
     no_delete: True/False (Default: False - delete files on target that do not exist in source)
     s3_metadata: String containing any metadata to add to the files. i.e. "Cache-Control=public, max-age=31536000"
-    s3_metadata_directive: String specifying whether data is COPY'ed or REPLACE'd. Default is REPLACE
+    s3_metadata_directive: String kept for backwards compatibility. Native uploads always REPLACE.
     s3_cache_control: String containing any cache-control information to add to the files. i.e. "max-age=86400"
     session: will use this session to build the client, default is _sessions
     region: will use a specific region to build the client, default is _sessions.region_name
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.s3_sync(): BEGIN (using session named: {_s.name})")
 
-    new_env = get_session_env(_s)
+    bucket = __s3_bucket_name(s3_bucket)
+    prefix = f"{s3_path.strip('/')}/" if s3_path and s3_path.strip('/') else ""
+    extra_args = __s3_extra_args(s3_metadata=s3_metadata, s3_cache_control=s3_cache_control)
 
-    s3_full_path = f"{s3_bucket}/{s3_path}/"
+    try:
+        client = _get_client(_s, 's3', _r)
 
-    optional_delete = "" if no_delete else "--delete"
+        local_files = __s3_walk_local(files)
 
-    _metadata = "" if not s3_metadata else f"--metadata \"{s3_metadata}\""
-    _cache_control = "" if not s3_cache_control else f"--cache-control \"{s3_cache_control}\""
-    _metadata_directive = "--metadata-directive REPLACE" if _cache_control else ""
-    if _metadata and not _cache_control:
-        _metadata_directive = "--metadata-directive REPLACE" if not s3_metadata_directive else f"--metadata-directive {s3_metadata_directive}"
-    loggy.info(f"aws s3 sync {optional_delete} {files} {s3_full_path} {_cache_control} {_metadata} {_metadata_directive}")
-    output = _run(f"aws s3 sync {optional_delete} {files} {s3_full_path} {_cache_control} {_metadata} {_metadata_directive}", check=True, shell=True, env=new_env)
-    new_env = []
-    if output.returncode != 0:
-        print(f"aws.s3_sync(): Failed to Sync to S3... {output.stderr}")
+        #
+        # One bulk listing of the remote prefix instead of per-file HEADs
+        #
+        remote_objects = {}
+        paginator = client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                remote_objects[obj['Key']] = obj
+
+        to_upload = []
+        for rel, full in local_files.items():
+            key = prefix + rel
+            obj = remote_objects.get(key)
+            if obj is not None and obj['Size'] == os.path.getsize(full) and obj['LastModified'].timestamp() >= os.path.getmtime(full):
+                continue
+            to_upload.append((full, key))
+
+        loggy.info(f"aws.s3_sync(): Uploading {len(to_upload)} of {len(local_files)} files to s3://{bucket}/{prefix}")
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(
+                lambda item: client.upload_file(item[0], bucket, item[1], ExtraArgs=__s3_upload_args(item[0], extra_args), Config=__s3_transfer_config()),
+                to_upload))
+
+        if not no_delete:
+            stale = [key for key in remote_objects if key[len(prefix):] not in local_files]
+            if stale:
+                loggy.info(f"aws.s3_sync(): Deleting {len(stale)} remote files not present locally")
+                for i in range(0, len(stale), 1000):
+                    client.delete_objects(
+                        Bucket=bucket,
+                        Delete={'Objects': [{'Key': key} for key in stale[i:i + 1000]]})
+    except Exception as e:
+        loggy.error(f"aws.s3_sync(): Failed to Sync to S3... {str(e)}")
         return False
 
     return True
@@ -1375,12 +1732,13 @@ def s3_cp(s3_bucket: str,
     s3_cp()
 
     Authenticate against the current/default S3 and push files.
+    Runs natively on boto3 (no aws cli subprocess).
 
     s3_bucket: the bucket to use
     s3_path: the path inside of the s3 bucket to place files
     files: a string containing either a single file or a folder containing all files you want pushed.
     s3_metadata: String containing any metadata to add to the files. i.e. "Cache-Control=public, max-age=31536000"
-    s3_metadata_directive: String specifying whether data is COPY'ed or REPLACE'd. Default is REPLACE
+    s3_metadata_directive: String kept for backwards compatibility. Native uploads always REPLACE.
     s3_cache_control: String containing any cache-control information to add to the files. i.e. "max-age=86400"
     s3_content_type: String containing any content type to add to the files. i.e. "application/json"
     session: will use this session to build the client, default is _sessions
@@ -1388,32 +1746,33 @@ def s3_cp(s3_bucket: str,
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.s3_cp(): BEGIN (using session named: {_s.name})")
 
-    new_env = get_session_env(_s)
+    bucket = __s3_bucket_name(s3_bucket)
+    extra_args = __s3_extra_args(s3_metadata=s3_metadata, s3_cache_control=s3_cache_control, s3_content_type=s3_content_type)
 
-    if not s3_bucket.startswith('s3://'):
-        s3_bucket = 's3://' + s3_bucket
+    try:
+        client = _get_client(_s, 's3', _r)
 
-    s3_full_path = f"{s3_bucket}/{s3_path}"
-    
-    recursive = "--recursive" if os.path.isdir(files) else ""
-    
-    _metadata = "" if not s3_metadata else f"--metadata \"{s3_metadata}\""
-    _cache_control = "" if not s3_cache_control else f"--cache-control \"{s3_cache_control}\""
-    _metadata_directive = "--metadata-directive REPLACE" if _cache_control else ""
-    if _metadata and not _cache_control:
-        _metadata_directive = "--metadata-directive REPLACE" if not s3_metadata_directive else f"--metadata-directive {s3_metadata_directive}"
-
-    _content_type = "" if not s3_content_type else f"--content-type \"{s3_content_type}\""
-
-    loggy.info(f"aws s3 cp {files} {s3_full_path} {recursive} {_cache_control} {_metadata} {_metadata_directive} {_content_type}")
-    output = _run(f"aws s3 cp {files} {s3_full_path} {recursive} {_cache_control} {_metadata} {_metadata_directive} {_content_type}", check=True, shell=True, env=new_env)
-    if output.returncode != 0:
-        loggy.info(f"aws.s3_cp(): Failed to cp to S3... {output.stderr}")
+        if os.path.isdir(files):
+            prefix = f"{s3_path.strip('/')}/" if s3_path and s3_path.strip('/') else ""
+            uploads = [(full, prefix + rel) for rel, full in __s3_walk_local(files).items()]
+        else:
+            key = s3_path
+            if not key or key.endswith('/'):
+                key = f"{key}{os.path.basename(files)}"
+            uploads = [(files, key)]
+
+        loggy.info(f"aws.s3_cp(): Uploading {len(uploads)} files to s3://{bucket}/{s3_path}")
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(
+                lambda item: client.upload_file(item[0], bucket, item[1], ExtraArgs=__s3_upload_args(item[0], extra_args), Config=__s3_transfer_config()),
+                uploads))
+    except Exception as e:
+        loggy.error(f"aws.s3_cp(): Failed to cp to S3... {str(e)}")
         return False
 
     return True
@@ -1430,6 +1789,7 @@ def s3_get(s3_bucket: str,
     s3_get()
 
     Authenticate against the current/default S3 and get a file.
+    Runs natively on boto3 (no aws cli subprocess).
 
     s3_bucket: the bucket to use
     s3_path: the object key to retrieve
@@ -1440,35 +1800,37 @@ def s3_get(s3_bucket: str,
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.s3_get(): BEGIN (using session named: {_s.name})")
 
-    new_env = get_session_env(_s)
+    bucket = __s3_bucket_name(s3_bucket)
 
-    if not s3_bucket.startswith('s3://'):
-        s3_bucket = 's3://' + s3_bucket
+    if not file_name:
+        file_name = s3_path.split('/')[-1]
 
-    s3_full_path = f"{s3_bucket}/{s3_path}"
-    
-    loggy.info(f"aws s3 cp {s3_full_path} {file_name}")
-    output = _run(f"aws s3 cp {s3_full_path} {file_name}", check=True, shell=True, env=new_env)
-    if output.returncode != 0:
-        loggy.info(f"aws.s3_get(): Failed to get {s3_full_path} from S3... {output.stderr}")
+    try:
+        client = _get_client(_s, 's3', _r)
+
+        if extracted_root:
+            #
+            # Stream the archive straight from S3 through tarfile instead of
+            # downloading to disk and shelling out to tar. The strip helper
+            # mirrors tar's --strip-components=1.
+            #
+            loggy.info(f"aws.s3_get(): Extracting s3://{bucket}/{s3_path} into {extracted_root}")
+            os.makedirs(extracted_root, exist_ok=True)
+            body = client.get_object(Bucket=bucket, Key=s3_path)['Body']
+            with tarfile.open(fileobj=body, mode='r|gz') as tar:
+                tar.extractall(path=extracted_root, members=__s3_strip_members(tar))
+        else:
+            loggy.info(f"aws.s3_get(): Downloading s3://{bucket}/{s3_path} to {file_name}")
+            client.download_file(bucket, s3_path, file_name, Config=__s3_transfer_config())
+    except Exception as e:
+        loggy.error(f"aws.s3_get(): Failed to get s3://{bucket}/{s3_path} from S3... {str(e)}")
         return False
 
-    if extracted_root:
-        output = _run(f"mkdir -p {extracted_root}", check=True, shell=True, env=new_env)
-        if output.returncode != 0:
-            loggy.info(f"aws.s3_get(): Failed to make folder {extracted_root} ... {output.stderr}")
-            return False
-
-        output = _run(f"tar -xzf {file_name} --strip-components=1 -C {extracted_root}/", check=True, shell=True, env=new_env)
-        if output.returncode != 0:
-            loggy.info(f"aws.s3_get(): Failed to extract {file_name} into {extracted_root}... {output.stderr}")
-            return False
-
     return True
 
 
@@ -1489,7 +1851,7 @@ def ssm_get_parameter_from_build(name: str, session: typing.Optional[AwsSession]
 
     Returns String containing param value
     """
-    _s = init_session() if session is None else session
+    _s = _LazySession() if session is None else session
     loggy.info(f"aws.ssm_get_parameter_from_build(): BEGIN (using session named: {_s.name})")
     return _s.ssm_get_parameter(name, session, region)
 
@@ -1506,27 +1868,65 @@ def ssm_get_parameter(name: str, session: typing.Optional[AwsSession] = None, re
 
     Returns String containing param value
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.ssm_get_parameter(): BEGIN (using session named: {_s.name})")
 
     """
     This function only takes a name not an arn
     """
-    name = name if ':parameter' not in name else name.split(':parameter')[1]
+    name = name.rpartition(':parameter')[2] or name
 
     try:
-        client = _s.session.client(service_name='ssm', region_name=_r)
+        client = _get_client(_s, 'ssm', _r)
         response = client.get_parameter(Name=name, WithDecryption=True)
 
         return response['Parameter']['Value']
     except Exception as e:
-        loggy.error("Error: " + str(e))
+        loggy.error("aws.ssm_get_parameter(): %s", e)
 
     return None
 
 
+def ssm_get_parameters(names: list, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> dict:
+    """
+    ssm_get_parameters()
+
+    Get multiple SSM Parameter values with a single GetParameters call
+    (max 10 names per call) instead of one round-trip each.
+
+    names: List of param friendly names or arns. Will convert arns into friendly names before use.
+    region: String defaults to AWS_DEFAULT_REGION or us-east-1
+    session: aws.Sessions() will use a different session to build the client, default is _sessions
+
+    Returns dict of name -> value. Missing params are logged and omitted.
+    """
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
+
+    loggy.info(f"aws.ssm_get_parameters(): BEGIN (using session named: {_s.name})")
+
+    """
+    This function only takes names not arns
+    """
+    _names = [n.rpartition(':parameter')[2] or n for n in names]
+
+    values = {}
+    try:
+        client = _get_client(_s, 'ssm', _r)
+        response = client.get_parameters(Names=_names, WithDecryption=True)
+
+        for param in response.get('Parameters', []):
+            values[param['Name']] = param['Value']
+        for missing in response.get('InvalidParameters', []):
+            loggy.info(f"aws.ssm_get_parameters(): Parameter not found: {missing}")
+    except Exception as e:
+        loggy.error("aws.ssm_get_parameters(): %s", e)
+
+    return values
+
+
 def ssm_put_parameter(name: str,
                       value: str,
                       type: typing.Optional[str] = None,
@@ -1548,8 +1948,8 @@ def ssm_put_parameter(name: str,
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.ssm_put_parameter(): BEGIN (using session named: {_s.name})")
 
@@ -1559,19 +1959,36 @@ def ssm_put_parameter(name: str,
     """
     This function only takes a name not an arn
     """
-    name = name if ':parameter' not in name else name.split(':parameter')[1]
+    name = name.rpartition(':parameter')[2] or name
+
+    kwargs = {'Name': name, 'Value': value, 'Type': type, 'Overwrite': True, 'Tier': tier}
+    if KeyId:
+        kwargs['KeyId'] = KeyId
+
+    from botocore.exceptions import ClientError
 
     try:
-        client = _s.session.client(service_name='ssm', region_name=_r)
-        if KeyId:
-            response = client.put_parameter(Name=name, Value=value, Type=type, Overwrite=True, KeyId=KeyId, Tier=tier)
-        else:
-            response = client.put_parameter(Name=name, Value=value, Type=type, Overwrite=True, Tier=tier)
+        client = _get_client(_s, 'ssm', _r)
+
+        #
+        # PutParameter is capped at 3 TPS, so concurrent deploys can throttle
+        # each other. Retry with exponential backoff + jitter instead of
+        # failing straight through to the Secrets Manager fallback.
+        #
+        for attempt in range(5):
+            try:
+                response = client.put_parameter(**kwargs)
+                break
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ThrottlingException' or attempt == 4:
+                    raise
+                loggy.info(f"aws.ssm_put_parameter(): Throttled putting {name}, retrying (attempt {attempt + 1})")
+                time.sleep(random.uniform(0, min(30, 0.5 * 2 ** attempt)))
 
         if response['Version']:
             return True
     except Exception as e:
-        loggy.error("Error: " + str(e))
+        loggy.error("aws.ssm_put_parameter(): %s", e)
 
     return False
 
@@ -1580,9 +1997,11 @@ def ssm_put_parameter(name: str,
 Lambda Utils
 """
 
-def lambda_update_docker(function_name: str, 
+def lambda_update_docker(function_name: str,
                         image_uri: str,
                         revision_id: typing.Optional[str] = None,
+                        force: typing.Optional[bool] = False,
+                        max_retries: typing.Optional[int] = 3,
                         session: typing.Optional[AwsSession] = None,
                         region: typing.Optional[str] = None) -> bool:
     """
@@ -1593,18 +2012,35 @@ def lambda_update_docker(function_name: str,
     function_name name of function to update
     image_uri full ECR url to docker image, including tag
     revision_id The revision ID of the old lambda, use this to avoid updating the wrong version
+    force True/False (Default: False - skip the update when the function already runs image_uri)
+    max_retries Integer number of optimistic-concurrency retries when the revision moves underneath us
     region defaults to AWS_DEFAULT_REGION or us-east-1
     session will use a different session to build the client, default is _sessions
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.lambda_update_docker(): BEGIN (using session named: {_s.name})")
 
     try:
-        client = _s.session.client(service_name='lambda', region_name=_r)
+        client = _get_client(_s, 'lambda', _r)
+
+        #
+        # update_function_code triggers a full deployment (image pull, cold
+        # start) even when nothing changed, so one cheap read up front lets
+        # repeat CI runs no-op instead. Its RevisionId doubles as our CAS
+        # token when the caller did not pin one.
+        #
+        cas_revision_id = revision_id
+        if not force:
+            current = client.get_function(FunctionName=function_name)
+            if current['Code'].get('ImageUri') == image_uri and revision_id in (None, current['Configuration'].get('RevisionId')):
+                loggy.info(f"aws.lambda_update_docker(): {function_name} already runs {image_uri}. Skipping update.")
+                return True
+            if not cas_revision_id:
+                cas_revision_id = current['Configuration'].get('RevisionId')
 
         # Prepare the arguments
         args = {
@@ -1614,16 +2050,28 @@ def lambda_update_docker(function_name: str,
         }
 
         # Add RevisionId only if it is not None or empty
-        if revision_id:
-            args['RevisionId'] = revision_id
+        if cas_revision_id:
+            args['RevisionId'] = cas_revision_id
 
-        # Call the update_function_code with the dynamically built arguments
-        response = client.update_function_code(**args)
+        #
+        # Optimistic concurrency: if someone else deployed between our read
+        # and the update, refresh the revision and retry - unless the caller
+        # pinned a specific revision, in which case the conflict is real.
+        #
+        for attempt in range(max_retries):
+            try:
+                response = client.update_function_code(**args)
+                break
+            except client.exceptions.PreconditionFailedException:
+                if revision_id or attempt == max_retries - 1:
+                    raise
+                loggy.info(f"aws.lambda_update_docker(): Revision moved underneath us, retrying (attempt {attempt + 1})")
+                args['RevisionId'] = client.get_function(FunctionName=function_name)['Configuration']['RevisionId']
 
         if response['Version']:
             return True
     except Exception as e:
-        loggy.error("Error: " + str(e))
+        loggy.error("aws.lambda_update_docker(): %s", e)
 
     return False
 
@@ -1632,7 +2080,21 @@ def lambda_update_docker(function_name: str,
 Route53 Utils
 """
 
-def route53_list_hosted_zones_by_name(domain_name: str, 
+#
+# Hosted zone IDs effectively never change, so remember domain -> zone id for
+# an hour. Update-heavy workflows would otherwise burn one of Route53's
+# 5 req/s on this lookup before every record change.
+#
+__zone_id_cache = {}
+__ZONE_ID_TTL = 3600
+
+#
+# Constant part of every TXT ChangeBatch; only Changes varies per call.
+#
+_TXT_CHANGE_HEADER = {'Comment': 'CircleCI Updating TXT'}
+
+
+def route53_list_hosted_zones_by_name(domain_name: str,
                         session: typing.Optional[AwsSession] = None,
                         region: typing.Optional[str] = None) -> str:
     """
@@ -1644,16 +2106,31 @@ def route53_list_hosted_zones_by_name(domain_name: str,
     """
     hosted_zone_id = None
 
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.route53_list_hosted_zones_by_name(): BEGIN (using session named: {_s.name})")
 
+    ts, cached_id = __zone_id_cache.get(domain_name, (0, None))
+    if cached_id and time.time() - ts < __ZONE_ID_TTL:
+        return cached_id
+
     try:
-        client = _s.session.client(service_name='route53')
-        hosted_zone_id = client.list_hosted_zones_by_name(DNSName=domain_name)['HostedZones'][0]['Id'].split('/')[-1]
+        client = _get_client(_s, 'route53')
+        #
+        # MaxItems=1 keeps Route53 from serializing up to 100 zones we would
+        # throw away anyway; verify the name so a near-miss (zone missing,
+        # next zone alphabetically returned) cannot hand back the wrong ID.
+        #
+        zones = client.list_hosted_zones_by_name(DNSName=domain_name, MaxItems="1")['HostedZones']
+        if not zones or zones[0]['Name'].rstrip('.') != domain_name.rstrip('.'):
+            loggy.error(f"aws.route53_list_hosted_zones_by_name(): No hosted zone found for {domain_name}")
+            return None
+
+        hosted_zone_id = zones[0]['Id'].rsplit('/', 1)[1]
+        __zone_id_cache[domain_name] = (time.time(), hosted_zone_id)
     except Exception as e:
-        loggy.error("aws.route53_list_hosted_zones_by_name(): Error: " + str(e))
+        loggy.error("aws.route53_list_hosted_zones_by_name(): %s", e)
 
     return hosted_zone_id
 
@@ -1673,17 +2150,22 @@ def route53_get_record_ttl(hosted_zone_id: str,
 
     :return: The TTL of the record if it exists, None otherwise.
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.route53_get_record_ttl(): BEGIN (using session named: {_s.name})")
 
     try:
-        client = _s.session.client(service_name='route53')
+        client = _get_client(_s, 'route53')
     
+        #
+        # Route53 returns names in canonical (trailing-dot) form, so query and
+        # compare in that form instead of rstrip'ing on every call.
+        #
+        canonical_name = record_name if record_name.endswith('.') else f"{record_name}."
         response = client.list_resource_record_sets(
             HostedZoneId=hosted_zone_id,
-            StartRecordName=record_name,
+            StartRecordName=canonical_name,
             StartRecordType=record_type,
             MaxItems="1"
         )
@@ -1692,18 +2174,18 @@ def route53_get_record_ttl(hosted_zone_id: str,
         record_sets = response.get("ResourceRecordSets", [])
         if record_sets:
             record = record_sets[0]
-            if record["Name"].rstrip(".") == record_name and record["Type"] == record_type:
+            if record["Name"] == canonical_name and record["Type"] == record_type:
                 return record.get("TTL")
         loggy.info("aws.route53_get_record_ttl(): Record not found.")
         return None
     except Exception as e:
-        loggy.info("aws.route53_get_record_ttl(): Error fetching record TTL:", e)
+        loggy.info("aws.route53_get_record_ttl(): Error fetching record TTL: %s", e)
         return None
 
 def route53_update_txt_record(record_name: str,
                         domain_name: str,
                         txt: str,
-                        ttl: typing.Optional[int] = 0,
+                        ttl: typing.Optional[int] = None,
                         session: typing.Optional[AwsSession] = None,
                         region: typing.Optional[str] = None) -> bool:
     """
@@ -1722,63 +2204,102 @@ def route53_update_txt_record(record_name: str,
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    return route53_update_txt_records(updates=[(record_name, domain_name, txt, ttl)], session=session, region=region)
 
-    loggy.info(f"aws.route53_update_txt_record(): BEGIN (using session named: {_s.name})")
 
-    hosted_zone_id = route53_list_hosted_zones_by_name(domain_name=domain_name, session=_s)
-    if not hosted_zone_id:
-        return False
+def route53_update_txt_records(updates: list,
+                        session: typing.Optional[AwsSession] = None,
+                        region: typing.Optional[str] = None) -> bool:
+    """
+    route53_update_txt_records()
 
-    fqdn = f"{record_name}.{domain_name}"
+    Update a batch of TXT records. Changes are grouped per hosted zone and
+    submitted as one ChangeBatch per zone (in chunks of 1000), so updating N
+    records costs O(zones) Route53 calls instead of N - important against
+    the account-wide 5 req/s Route53 limit.
+
+    updates: list of (record_name, domain_name, txt, ttl) tuples. A falsy
+        ttl reuses the TTL already on the record.
+    region defaults to AWS_DEFAULT_REGION or us-east-1
+    session will use a different session to build the client, default is _sessions
+
+    Returns: True/False
+    """
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
+
+    loggy.info(f"aws.route53_update_txt_records(): BEGIN (using session named: {_s.name})")
 
     try:
-        client = _s.session.client(service_name='route53')
+        client = _get_client(_s, 'route53')
+
+        zone_ids = {}
+        for _, domain_name, _, _ in updates:
+            if domain_name not in zone_ids:
+                hosted_zone_id = route53_list_hosted_zones_by_name(domain_name=domain_name, session=_s)
+                if not hosted_zone_id:
+                    return False
+                zone_ids[domain_name] = hosted_zone_id
+
+        def __lookup_ttl(hosted_zone_id, fqdn):
+            """
+            Route53 is capped at 5 req/s account-wide, so skip every pre-check
+            we can: UPSERT is idempotent and errors clearly on a bad zone, so
+            only look the record up when we need its existing TTL.
+            """
+            response = client.list_resource_record_sets(
+                HostedZoneId=hosted_zone_id,
+                StartRecordName=f"{fqdn}.",
+                StartRecordType='TXT',
+                MaxItems="1"
+            )
+            record_sets = response.get("ResourceRecordSets", [])
+            if record_sets and record_sets[0]["Name"] == f"{fqdn}." and record_sets[0]["Type"] == 'TXT':
+                return record_sets[0].get("TTL")
+            return None
 
         #
-        # If we get a ttl requested, we still need to check to make sure the record exists
-        # Otherwise, getting the TTL from route53 is our exist check.
+        # The TTL lookups are independent round-trips, so overlap them with a
+        # small pool - capped at 5 workers to stay inside Route53's rate limit.
         #
-        if not ttl:
-            ttl = route53_get_record_ttl(hosted_zone_id=hosted_zone_id, record_name=fqdn, session=_s)
-            if not ttl:
-                raise Exception("aws.route53_update_txt_record() Could not get TTL from route53")
+        ttl_futures = {}
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            for record_name, domain_name, txt, ttl in updates:
+                if not ttl:
+                    fqdn = f"{record_name}.{domain_name}"
+                    ttl_futures[fqdn] = executor.submit(__lookup_ttl, zone_ids[domain_name], fqdn)
+
+        changes_by_zone = {}
+        for record_name, domain_name, txt, ttl in updates:
+            hosted_zone_id = zone_ids[domain_name]
+            fqdn = f"{record_name}.{domain_name}"
 
-        #
-        # Ensure the record exists before attempting to update it
-        #
-        response = client.test_dns_answer(
-            HostedZoneId=hosted_zone_id,
-            RecordName=f"{record_name}.{domain_name}",
-            RecordType='TXT',
-        )
-
-
-        response = client.change_resource_record_sets(
-            HostedZoneId=hosted_zone_id,
-            ChangeBatch={
-                'Comment': 'CircleCI Updating TXT',
-                'Changes': [
-                    {
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': f"{record_name}.{domain_name}",
-                            'Type': 'TXT',
-                            'TTL': ttl,
-                            'ResourceRecords': [
-                                {'Value': '"' + txt + '"'}
-                            ]
-                        }
-                    }
+            if not ttl:
+                ttl = ttl_futures[fqdn].result()
+                if not ttl:
+                    raise Exception("aws.route53_update_txt_records() Could not get TTL from route53")
+
+            rr_set = {
+                'Name': fqdn,
+                'Type': 'TXT',
+                'TTL': ttl,
+                'ResourceRecords': [
+                    {'Value': f'"{txt}"'}
                 ]
             }
-        )
+            changes_by_zone.setdefault(hosted_zone_id, []).append({'Action': 'UPSERT', 'ResourceRecordSet': rr_set})
+
+        for hosted_zone_id, changes in changes_by_zone.items():
+            for i in range(0, len(changes), 1000):
+                response = client.change_resource_record_sets(
+                    HostedZoneId=hosted_zone_id,
+                    ChangeBatch={**_TXT_CHANGE_HEADER, 'Changes': changes[i:i + 1000]}
+                )
+                loggy.info(response['ChangeInfo'])
 
-        loggy.info(response['ChangeInfo'])
         return True
     except Exception as e:
-        loggy.error("aws.route53_update_txt_record(): Error: " + str(e))
+        loggy.exception("aws.route53_update_txt_records(): %s", e)
 
     return False
 
@@ -1787,6 +2308,38 @@ def route53_update_txt_record(record_name: str,
 SecretsManger Utils
 """
 
+#
+# orjson parses medium-to-large JSON secrets a few times faster than stdlib
+# json; fall back to stdlib when it is not in the image. orjson raises its
+# own JSONDecodeError, a ValueError subclass, so callers catch ValueError.
+#
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+#
+# AWSCURRENT secret values are effectively immutable within one script run,
+# so cache them for a short TTL (AWS_SECRET_TTL seconds, default 60) to keep
+# repeat callers from re-issuing the same get_secret_value round-trip.
+#
+__secret_cache = {}
+
+
+def secrets_invalidate(name: typing.Optional[str] = None):
+    """
+    secrets_invalidate()
+
+    Drop a cached secret value (or all of them) so the next fetch goes back
+    to Secrets Manager.
+
+    name: String secret name/arn to drop. Drops the whole cache when None.
+    """
+    if name is None:
+        __secret_cache.clear()
+    else:
+        __secret_cache.pop(name, None)
+
 
 def secrets_get_secret_string(name: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> dict:
     """
@@ -1801,30 +2354,83 @@ def secrets_get_secret_string(name: str, session: typing.Optional[AwsSession] =
 
     Returns: dict containing secret string
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.secrets_get_secret_string(): BEGIN (using session named: {_s.name})")
     loggy.info(f"aws.secrets_get_secret_string(): region name {_r}")
+
+    hit = __secret_cache.get(name)
+    if hit and time.time() - hit[0] < int(os.environ.get('AWS_SECRET_TTL', '60')):
+        loggy.info(f"aws.secrets_get_secret_string(): Returning cached secret for: {name}")
+        return hit[1]
+
     try:
-        client = _s.session.client(service_name='secretsmanager', region_name=_r)
+        client = _get_client(_s, 'secretsmanager', _r)
 
         loggy.info(f"aws.secrets_get_secret_string(): getting secret from: {name}")
         response = client.get_secret_value(SecretId=name)
 
         try:
-            ret_val = json.loads(response['SecretString'])
+            ret_val = _json_loads(response['SecretString'])
             loggy.info(f"aws.secrets_get_secret_string(): Returning a json object from secrets.")
-            return ret_val
-        except json.decoder.JSONDecodeError as e:
+        except ValueError as e:
             loggy.info(f"aws.secrets_get_secret_string(): Returing a string from secrets.")
-            return response['SecretString']            
+            ret_val = response['SecretString']
+
+        __secret_cache[name] = (time.time(), ret_val)
+        return ret_val
 
     except Exception as e:
-        loggy.error("aws.secrets_get_secret_string(): Exception: " + str(e))
+        loggy.error("aws.secrets_get_secret_string(): %s", e)
 
     return {}
 
+def secrets_get_secret_strings(names: list, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> dict:
+    """
+    secrets_get_secret_strings()
+
+    Retrieve a batch of secret string values in one shot. BatchGetSecretValue
+    returns up to 20 secrets per call, so N secrets cost ceil(N/20) round
+    trips instead of N.
+
+    names: list of param friendly names or arns
+    region defaults to AWS_DEFAULT_REGION or us-east-1
+    session will use a different session to build the client, default is _sessions
+
+    Returns: dict of name -> secret value (parsed json where possible)
+    """
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
+
+    loggy.info(f"aws.secrets_get_secret_strings(): BEGIN (using session named: {_s.name})")
+
+    secrets = {}
+    try:
+        client = _get_client(_s, 'secretsmanager', _r)
+
+        for i in range(0, len(names), 20):
+            kwargs = {'SecretIdList': names[i:i + 20]}
+            while True:
+                response = client.batch_get_secret_value(**kwargs)
+                for secret in response.get('SecretValues', []):
+                    try:
+                        value = _json_loads(secret['SecretString'])
+                    except ValueError:
+                        value = secret['SecretString']
+                    secrets[secret['Name']] = value
+                if not response.get('NextToken'):
+                    break
+                kwargs['NextToken'] = response['NextToken']
+
+            for error in response.get('Errors', []):
+                loggy.error(f"aws.secrets_get_secret_strings(): {error.get('SecretId')}: {error.get('Message')}")
+    except Exception as e:
+        loggy.error("aws.secrets_get_secret_strings(): %s", e)
+
+    return secrets
+
+
 def secrets_get_secret_string_from_build(name: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> str:
     """
     secrets_get_secret_string_from_build()
@@ -1837,10 +2443,10 @@ def secrets_get_secret_string_from_build(name: str, session: typing.Optional[Aws
 
     Returns String containing Secret value
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
     loggy.info(f"aws.secrets_get_secret_string_from_build(): BEGIN (using session named: {_s.name})")
-    return _s.secrets_get_secret_string(name, session, region)
+    return secrets_get_secret_string(name=name, session=_s, region=_r)
 
 
 def secrets_put_secret_string(name: str, value: str, session: typing.Optional[AwsSession] = None, region: typing.Optional[str] = None) -> bool:
@@ -1855,8 +2461,8 @@ def secrets_put_secret_string(name: str, value: str, session: typing.Optional[Aw
 
     Returns: True/False
     """
-    _s = init_session() if session is None else session
-    _r = _s.session.region_name if region is None else region
+    _s = _LazySession() if session is None else session
+    _r = _s.region if region is None else region
 
     loggy.info(f"aws.secrets_put_secret_string(): BEGIN (using session named: {_s.name})")
     loggy.info(f"aws.secrets_put_secret_string(): region name {_r}")
@@ -1868,7 +2474,7 @@ def secrets_put_secret_string(name: str, value: str, session: typing.Optional[Aw
         #     SecretString='{"username":"david","password":"EXAMPLE-PASSWORD"}',
         # )
 
-        client = _s.session.client(service_name='secretsmanager', region_name=_r)
+        client = _get_client(_s, 'secretsmanager', _r)
 
         response = client.put_secret_value(
             SecretId=name,
@@ -1879,6 +2485,6 @@ def secrets_put_secret_string(name: str, value: str, session: typing.Optional[Aw
         if 'VersionId' in response:
             return True
     except Exception as e:
-        loggy.error("aws.secrets_put_secret_string(): Exception: " + str(e))
+        loggy.error("aws.secrets_put_secret_string(): %s", e)
 
     return False
\ No newline at end of file
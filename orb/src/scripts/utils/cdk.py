@@ -9,7 +9,9 @@ Example Usage:
     from utils.cdk import get_cdk_required_version
 """
 
+import functools
 import subprocess
+import threading
 import os
 import sys
 from pathlib import Path
@@ -17,189 +19,132 @@ import re
 import typing
 import glob
 import json
+import shlex
+import string
 import yaml
 import shutil
 
 sys.path.insert(0, '/home/circleci/bin')
 
 import loggy
-from common import subprocess_long as _long_run, ChDir as _chdir
+from common import subprocess_stream as _stream_run, ChDir as _chdir
+from concurrent.futures import ThreadPoolExecutor
 
-def deploy(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
-    """
-    deploy()
-
-    Runs `cdk deploy` using the properties_env to locate the `properties.env.json` file
-
-    properties_env: String containing env name to locate the properties file
-    lang: String representing the type of CDK code to deploy
-    path: String (Optional) Will use the CDK_PATH env variable or search for the cdk.json file recursively if this path is not set.
-    poetry_path: String (Options) Will use the POETRY_PATH env variable, or default to CDK_PATH if None
-    poetry_install_cmd: String (Options) Will use the POETRY_INSTALL_CMD env variable, or default to "poetry install" if None
-
-    Returns: True/False
-    """
-
-    _CDK_PATH = get_cdk_path(path)
-    _PROPS_FILE = f"properties.{properties_env}.json"
-    _CDK_DEPLOY_FILE = f"{os.getcwd()}/cdk.deploy.txt"
-
-    _POETRY_PATH = poetry_path or os.environ.get('POETRY_PATH') or os.environ.get('CIRCLE_WORKING_DIRECTORY') or _CDK_PATH
-    _POETRY_INSTALL_CMD = os.environ.get('POETRY_INSTALL_CMD', poetry_install_cmd)
-    loggy.info(f"cdk.deploy(): Running with values: _POETRY_PATH {_POETRY_PATH} _POETRY_INSTALL_CMD {_POETRY_INSTALL_CMD}")
-
-    with _chdir(_POETRY_PATH):
-      if not install_cdk_requirements(cdk_lang=lang, poetry_install_cmd=_POETRY_INSTALL_CMD):
-          loggy.info(
-              "cdk.deploy(): Failed to install cdk requirements. Check logs.")
-          return False
-
-    with _chdir(_CDK_PATH):
-        env_file = Path(_PROPS_FILE).read_text()
-        # env_data = json.load(env_file)
-        loggy.info(f"cdk.deploy(): {env_file}")
-
-        loggy.info("Setting environment for cdk deploy")
-        aws_session_env = os.environ.copy()
-
-        loggy.info("Adding our properties ENV file to the environment")
-        aws_session_env["ENV"] = properties_env
-
-        loggy.info("Running CDK bootstrap")
-        if not bootstrap_cdk_environment(cdk_lang=lang, aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD):
-          loggy.info(
-            "cdk.deploy(): Failed to bootstrap cdk environment. Check logs.")
-          return False
-
-        loggy.info("Running CDK deploy")
-        _process_output = _long_run(
-            ['poetry', 'run', 'cdk', 'deploy', '--require-approval', 'never', '--all'], env=aws_session_env, check=False)
-        loggy.info("----------------------------------")
-        loggy.info(
-            f"cdk.deploy(): CDK returned {str(_process_output.returncode)}")
-
-        with open(_CDK_DEPLOY_FILE, 'w') as file:
-            if _process_output.stderr:
-                file.write(_process_output.stderr)
+#
+# orjson parses the multi-hundred-KB synthesized templates several times
+# faster than the stdlib parser; fall back quietly when it is not installed.
+#
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-            if _process_output.stdout:
-                file.write(_process_output.stdout)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
-        if _process_output.returncode != 0:
-            return False
+#
+# Serializes the poetry/npm dependency install when deploy_many() runs
+# several envs at once - they all share the same poetry project.
+#
+_INSTALL_LOCK = threading.Lock()
 
-    return True
+# Default poetry install argv - built once, not re-split per install call.
+_DEFAULT_POETRY_INSTALL = ('poetry', 'install')
 
 
-def diff(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+@functools.lru_cache(maxsize=None)
+def _split_install_cmd(poetry_install_cmd: str) -> tuple:
     """
-    diff()
-
-    Runs `cdk diff` using the properties_env to locate the `properties.env.json` file
-
-    properties_env: String containing env name to locate the properties file
-    lang: String representing the type of CDK code to deploy (python, ts, typescript)
-    path: String (Optional) Will use the CDK_PATH env variable or search for the cdk.json file recursively if this path is not set.
-    poetry_path: String (Options) Will use the POETRY_PATH env variable, or default to CDK_PATH if None
-    poetry_install_cmd: String (Options) Will use the POETRY_INSTALL_CMD env variable, or default to "poetry install" if None
+    _split_install_cmd()
 
-    Returns: True/False
+    Tokenize a user-supplied poetry install command once per distinct string,
+    with shlex so quoted arguments survive.
     """
+    return tuple(shlex.split(poetry_install_cmd))
 
-    _CDK_PATH = get_cdk_path(path)
-    _PROPS_FILE = f"properties.{properties_env}.json"
-    _CDK_DIFF_FILE = f"{os.getcwd()}/cdk.diff.txt"
-
-    _POETRY_PATH = poetry_path or os.environ.get('POETRY_PATH') or os.environ.get('CIRCLE_WORKING_DIRECTORY') or _CDK_PATH
-    _POETRY_INSTALL_CMD = os.environ.get('POETRY_INSTALL_CMD', poetry_install_cmd)
-    loggy.info(f"cdk.diff(): Running with values: _POETRY_PATH {_POETRY_PATH} _POETRY_INSTALL_CMD {_POETRY_INSTALL_CMD}")
-
-    with _chdir(_POETRY_PATH):
-      if not install_cdk_requirements(cdk_lang=lang, poetry_install_cmd=_POETRY_INSTALL_CMD):
-          loggy.info(
-              "cdk.diff(): Failed to install cdk requirements. Check logs.")
-          return False
-
-    _EXIT = True
-    with _chdir(_CDK_PATH):
-        env_file = Path(_PROPS_FILE).read_text()
-        # env_data = json.load(env_file)
-        loggy.info(f"cdk.diff(): {env_file}")
-
-        loggy.info("Setting environment for cdk deploy")
-        aws_session_env = os.environ.copy()
-
-        loggy.info("Adding our properties ENV file to the environment")
-        aws_session_env["ENV"] = properties_env
-
-        loggy.info("Running CDK bootstrap")
-        if not bootstrap_cdk_environment(cdk_lang=lang, aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD):
-          loggy.info(
-            "cdk.deploy(): Failed to bootstrap cdk environment. Check logs.")
-          return False
-
-        loggy.info("Running CDK diff")
-        #
-        # CDK finally added a CI option so logs are sent to stdout. 
-        #
-        _process_output = _long_run(
-            ['poetry', 'run', 'cdk', 'diff', '--fail', '--ci', '--verbose'], env=aws_session_env, check=False)
-        loggy.info("----------------------------------")
-        loggy.info(
-            f"cdk.diff(): CDK returned {str(_process_output.returncode)}")
-        # loggy.info("----------------------------------")
-        # loggy.info(f"cdk.diff(): CDK returned {str(_process_output.stderr)}")
-        # loggy.info("----------------------------------")
-        # loggy.info(f"cdk.diff(): CDK returned {str(_process_output.stdout)}")
-        # loggy.info("----------------------------------")
-
-        if _process_output.returncode != 0:
-            loggy.info("cdk.diff(): Testing for CDK Diff or Error.")
-
-            with open(_CDK_DIFF_FILE, 'w') as file:
-                file.write(_process_output.stdout)
-
-            if '[~]' in _process_output.stdout or '[+]' in _process_output.stdout or '[-]' in _process_output.stdout or '[=]' in _process_output.stdout:
-                loggy.info("cdk.diff(): CDK Diff found!")
-                _EXIT = True
-            else:
-                loggy.info("cdk.diff(): CDK ERROR!")
-                for stack in glob.glob('cdk.out/*.json'):
-                    loggy.info("----------------------------------")
-                    loggy.info("STACK: " + stack)
-                    _stack_yaml = yaml.dump(
-                        json.loads(Path(stack).read_text()))
-                    loggy.info(_stack_yaml)
-                _EXIT = False
-
-        else:
-            # if 'DEPLOY_OVERRIDE' in os.environ.keys():
-            #     print("cdkDiff.__main__(): No CDK diff! Overriding CDK_DIFF because DEPLOY_OVERRIDE")
-            #     _EXIT = 0
-            # else:
-            with open(_CDK_DIFF_FILE, 'w') as file:
-                file.write(
-                    "NO CDK diff found. This could be an AMI SSM Param change. Deploy proceding.")
-
-            loggy.info(
-                "cdk.diff(): NO CDK diff found. This could be an AMI SSM Param change. Deploy proceding.")
-            _EXIT = True
-
-    return _EXIT
 
+# Poetry projects (by cwd) whose env has already been selected this process.
+_poetry_env_ready = set()
 
-def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.html', verbose: bool = False) -> bool:
 
-    _CDK_DIFF_FILE = diff_file
-    _CDK_HTML_OUTPUT_FILE = output_file
-    _VERBOSE = verbose
+def _ensure_poetry_env(python_version: str) -> None:
+    """
+    _ensure_poetry_env()
 
-    html_template = """
+    Run `poetry env use` only when the current project's poetry env does not
+    already target python_version. `poetry env use` probes the interpreter and
+    can rebuild the virtualenv lookup (seconds per call), while `env info -p`
+    is a cheap read - poetry names envs with a -pyX.Y suffix we can check.
+    Remembers matched projects so repeat installs in one process skip both.
+    """
+    _key = (os.getcwd(), python_version)
+    if _key in _poetry_env_ready:
+        return
+
+    _info = subprocess.run(
+        ['poetry', 'env', 'info', '-p'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False, text=True)
+    _major_minor = '.'.join(python_version.split('.')[:2])
+    if _info.returncode == 0 and _info.stdout.strip().endswith(f"-py{_major_minor}"):
+        loggy.info(f"cdk._ensure_poetry_env(): Poetry env already targets python {_major_minor}, skipping `poetry env use`.")
+    else:
+        subprocess.run(['poetry', 'env', 'use', python_version], check=True)
+
+    _poetry_env_ready.add(_key)
+
+#
+# setup.py version-pin rewrites, precompiled and keyed on the CDK major
+# version; {v} is filled with the required version at patch time.
+#
+_SETUP_PY_PATCHES = {
+    '1': (
+        (re.compile(r'aws_cdk\.aws_(.*)"'), r'aws_cdk.aws_\1=={v}"'),
+    ),
+    '2': (
+        # Both v2 spellings in one alternation - a single scan of the file.
+        (re.compile(r'(aws-cdk-lib|aws_cdk_lib)(.*)"'), r'\1\2=={v}"'),
+    ),
+}
+
+#
+# Pre-rendered HTML fragments for diff_pretty(). Kept at module scope with a
+# single {line} slot so the hot per-line loop formats one placeholder instead
+# of re-building the whole fragment literal on every matching line.
+#
+_TPL_CLOSE = '</pre></div></li></ul>'
+_TPL_CREATE = "<ul class=\"actions\"><li class=\"create\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Addition</span></div><div class\"changes\"><pre>{line}"
+_TPL_DESTROY = "<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Delete</span></div><div class\"changes\"><pre>{line}"
+_TPL_UPDATE = "<ul class=\"actions\"><li class=\"update\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Update</span></div><div class\"changes\"><pre>{line}"
+_TPL_REPLACE = "<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">REPLACEMENT</span></div><div class\"changes\"><pre>{line}"
+_TPL_NO_DIFF = "<ul class=\"actions\"><li class=\"read\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">No Diff</span></div><div class\"changes\"><pre>{line}"
+
+#
+# Dispatch on the 3-char diff marker instead of a startswith ladder.
+#
+_HANDLERS = {'[+]': _TPL_CREATE, '[-]': _TPL_DESTROY, '[~]': _TPL_UPDATE}
+
+#
+# Section headers keyed on their first word: one dict lookup plus at most one
+# startswith confirmation instead of testing every prefix on every line.
+#
+_SECTION_TAGS = {
+    'IAM': ('IAM Policy Changes', 'IAM'),
+    'Resources': ('Resources', 'Resources'),
+    'Outputs': ('Outputs', 'Outputs'),
+    'There': ('There were no differences', 'NoDiff'),
+}
+
+#
+# The prettyplan HTML shell for diff_pretty(), parsed once at import with
+# string.Template placeholders ($title/$h1/$stacks). The CSS is full of
+# literal braces, so $-style slots beat str.format here, and a single
+# substitute replaces the three full-template .replace() scans per call.
+#
+_HTML_TEMPLATE = string.Template("""
 <!DOCTYPE html>
 <html>
   <head>
     <meta charset="utf-8" />
-    <title>prettyplan</title>
+    <title>$title</title>
     <meta name="viewport" content="width=device-width, initial-scale=1" />
     <link rel="stylesheet" type="text/css" href="https://cdn.jsdelivr.net/npm/diff2html/bundles/css/diff2html.min.css" />
     <style>
@@ -532,7 +477,7 @@ def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.ht
   <body>
     <div class="stripe"></div>
     <div class="container">
-      <h1>prettyplan</h1>
+      <h1>$h1</h1>
       <div id="parsing-error-message" class="hidden">
         That doesn't look like a Terraform plan. Did you copy the entire output (without colouring) from the plan
         command?
@@ -542,7 +487,7 @@ def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.ht
         <ul id="warnings" class="warnings"></ul>
         <button class="expand-all" onclick="expandAll()">Expand all</button>
         <button class="collapse-all hidden" onclick="collapseAll()">Collapse all</button>
-        <div id="stacks"></div>
+        <div id="stacks">$stacks</div>
         <ul id="actions" class="actions"></ul>
         <pre id="diff"></pre>
       </div>
@@ -601,7 +546,298 @@ def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.ht
     </script>
   </body>
 </html>
-"""
+""")
+
+
+def _json_to_yaml(path: str) -> str:
+    """
+    _json_to_yaml()
+
+    Render one synthesized stack template (JSON) as YAML, using the libyaml
+    CSafeDumper which is several times faster than the pure-Python dumper.
+    """
+    return yaml.dump(_loads(Path(path).read_bytes()), Dumper=_YAML_DUMPER)
+
+
+def deploy(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+    """
+    deploy()
+
+    Runs `cdk deploy` using the properties_env to locate the `properties.env.json` file
+
+    properties_env: String containing env name to locate the properties file
+    lang: String representing the type of CDK code to deploy
+    path: String (Optional) Will use the CDK_PATH env variable or search for the cdk.json file recursively if this path is not set.
+    poetry_path: String (Options) Will use the POETRY_PATH env variable, or default to CDK_PATH if None
+    poetry_install_cmd: String (Options) Will use the POETRY_INSTALL_CMD env variable, or default to "poetry install" if None
+
+    Returns: True/False
+    """
+
+    _CDK_PATH = get_cdk_path(path)
+    _PROPS_FILE = f"properties.{properties_env}.json"
+    #
+    # Per-env outfile - concurrent deploy_many() workers would otherwise
+    # truncate and interleave each other in one shared cdk.deploy.txt,
+    # mirroring the per-env cdk.out.{env} assembly dirs below.
+    #
+    _CDK_DEPLOY_FILE = f"{os.getcwd()}/cdk.deploy.{properties_env}.txt"
+
+    _POETRY_PATH = poetry_path or os.environ.get('POETRY_PATH') or os.environ.get('CIRCLE_WORKING_DIRECTORY') or _CDK_PATH
+    _POETRY_INSTALL_CMD = os.environ.get('POETRY_INSTALL_CMD', poetry_install_cmd)
+    loggy.info(f"cdk.deploy(): Running with values: _POETRY_PATH {_POETRY_PATH} _POETRY_INSTALL_CMD {_POETRY_INSTALL_CMD}")
+
+    #
+    # Don't read the props file just to log it - large prop files cost a file
+    # read plus several MB of log per deploy. Just confirm it exists.
+    #
+    _props_path = os.path.join(_CDK_PATH, _PROPS_FILE)
+    if not os.path.exists(_props_path):
+        loggy.info(f"cdk.deploy(): Props file {_props_path} does NOT exist.")
+        return False
+    loggy.info(f"cdk.deploy(): Using props file {_props_path}")
+
+    loggy.info("Setting environment for cdk deploy")
+    #
+    # Build a single overlay dict rather than mutating os.environ, so
+    # concurrent deploy_many() workers each get their own ENV value.
+    #
+    loggy.info("Adding our properties ENV file to the environment")
+    aws_session_env = {**os.environ, 'ENV': properties_env}
+
+    #
+    # The dependency install only touches the local poetry env while bootstrap
+    # only talks to CloudFormation, so overlap them. Bootstrap runs with an
+    # explicit cwd because os.chdir is process-global and the main thread is
+    # chdir'ed into the poetry path meanwhile.
+    #
+    loggy.info("Running CDK bootstrap")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _bootstrap_future = executor.submit(
+            bootstrap_cdk_environment, cdk_lang=lang, aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD, cwd=_CDK_PATH)
+
+        with _INSTALL_LOCK, _chdir(_POETRY_PATH):
+            _install_ok = install_cdk_requirements(cdk_lang=lang, poetry_install_cmd=_POETRY_INSTALL_CMD)
+
+        _bootstrap_ok = _bootstrap_future.result()
+
+    if not _install_ok:
+        loggy.info(
+            "cdk.deploy(): Failed to install cdk requirements. Check logs.")
+        return False
+
+    if not _bootstrap_ok:
+        loggy.info(
+            "cdk.deploy(): Failed to bootstrap cdk environment. Check logs.")
+        return False
+
+    #
+    # Synth once and point deploy at the resulting assembly so the cdk
+    # command does not re-synth the whole app a second time. The cdk commands
+    # get an explicit cwd= and a per-env --output dir so concurrent
+    # deploy_many() workers don't fight over the process cwd or share cdk.out.
+    #
+    _CDK_OUT = f"cdk.out.{properties_env}"
+    loggy.info("Running CDK synth")
+    _app_args = ['--app', _CDK_OUT] if synth_cloud_assembly(
+        aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD, cwd=_CDK_PATH, output=_CDK_OUT) else []
+
+    loggy.info("Running CDK deploy")
+    #
+    # Stream the deploy output straight into the result file instead of
+    # buffering it all in memory and writing it after the fact. The
+    # per-line logging also keeps the pipeline alive on long deploys.
+    #
+    _returncode, _ = _stream_run(
+        ['poetry', 'run', 'cdk', 'deploy', '--require-approval', 'never', '--all'] + _app_args, outfile=_CDK_DEPLOY_FILE, env=aws_session_env, cwd=_CDK_PATH)
+    loggy.info("----------------------------------")
+    loggy.info(
+        f"cdk.deploy(): CDK returned {str(_returncode)}")
+
+    if _returncode != 0:
+        return False
+
+    return True
+
+
+def deploy_many(envs: typing.List[str], max_workers: int = 4) -> typing.Dict[str, bool]:
+    """
+    deploy_many()
+
+    Run deploy() for several property envs concurrently. CloudFormation
+    deploys spend most of their time waiting on API roundtrips, so
+    independent envs overlap well; each worker synths into its own
+    cdk.out.{env} and runs cdk with an explicit cwd, and the shared
+    dependency install is serialized behind a lock.
+
+    envs: List of property env names to deploy
+
+    Returns: dict mapping env name to its deploy() True/False result
+    """
+    loggy.info("cdk.deploy_many(): BEGIN")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(envs, executor.map(deploy, envs)))
+
+    loggy.info("cdk.deploy_many(): END")
+    return results
+
+
+
+def diff(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+    """
+    diff()
+
+    Runs `cdk diff` using the properties_env to locate the `properties.env.json` file
+
+    properties_env: String containing env name to locate the properties file
+    lang: String representing the type of CDK code to deploy (python, ts, typescript)
+    path: String (Optional) Will use the CDK_PATH env variable or search for the cdk.json file recursively if this path is not set.
+    poetry_path: String (Options) Will use the POETRY_PATH env variable, or default to CDK_PATH if None
+    poetry_install_cmd: String (Options) Will use the POETRY_INSTALL_CMD env variable, or default to "poetry install" if None
+
+    Returns: True/False
+    """
+
+    _CDK_PATH = get_cdk_path(path)
+    _PROPS_FILE = f"properties.{properties_env}.json"
+    _CDK_DIFF_FILE = f"{os.getcwd()}/cdk.diff.txt"
+
+    _POETRY_PATH = poetry_path or os.environ.get('POETRY_PATH') or os.environ.get('CIRCLE_WORKING_DIRECTORY') or _CDK_PATH
+    _POETRY_INSTALL_CMD = os.environ.get('POETRY_INSTALL_CMD', poetry_install_cmd)
+    loggy.info(f"cdk.diff(): Running with values: _POETRY_PATH {_POETRY_PATH} _POETRY_INSTALL_CMD {_POETRY_INSTALL_CMD}")
+
+    #
+    # Don't read the props file just to log it - large prop files cost a file
+    # read plus several MB of log per diff. Just confirm it exists.
+    #
+    _props_path = os.path.join(_CDK_PATH, _PROPS_FILE)
+    if not os.path.exists(_props_path):
+        loggy.info(f"cdk.diff(): Props file {_props_path} does NOT exist.")
+        return False
+    loggy.info(f"cdk.diff(): Using props file {_props_path}")
+
+    loggy.info("Setting environment for cdk deploy")
+    #
+    # Build a single overlay dict rather than mutating os.environ, so
+    # concurrent deploy_many() workers each get their own ENV value.
+    #
+    loggy.info("Adding our properties ENV file to the environment")
+    aws_session_env = {**os.environ, 'ENV': properties_env}
+
+    #
+    # The dependency install only touches the local poetry env while bootstrap
+    # only talks to CloudFormation, so overlap them. Bootstrap runs with an
+    # explicit cwd because os.chdir is process-global and the main thread is
+    # chdir'ed into the poetry path meanwhile.
+    #
+    loggy.info("Running CDK bootstrap")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _bootstrap_future = executor.submit(
+            bootstrap_cdk_environment, cdk_lang=lang, aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD, cwd=_CDK_PATH)
+
+        with _INSTALL_LOCK, _chdir(_POETRY_PATH):
+            _install_ok = install_cdk_requirements(cdk_lang=lang, poetry_install_cmd=_POETRY_INSTALL_CMD)
+
+        _bootstrap_ok = _bootstrap_future.result()
+
+    if not _install_ok:
+        loggy.info(
+            "cdk.diff(): Failed to install cdk requirements. Check logs.")
+        return False
+
+    if not _bootstrap_ok:
+        loggy.info(
+            "cdk.diff(): Failed to bootstrap cdk environment. Check logs.")
+        return False
+
+    _EXIT = True
+    #
+    # Synth once and point diff at the resulting assembly so the cdk command
+    # does not re-synth the whole app a second time. The cdk commands get an
+    # explicit cwd= and a per-env --output dir so concurrent callers don't
+    # fight over the process cwd or share cdk.out.
+    #
+    _CDK_OUT = f"cdk.out.{properties_env}"
+    loggy.info("Running CDK synth")
+    _app_args = ['--app', _CDK_OUT] if synth_cloud_assembly(
+        aws_session_env=aws_session_env, poetry_install_cmd=_POETRY_INSTALL_CMD, cwd=_CDK_PATH, output=_CDK_OUT) else []
+
+    loggy.info("Running CDK diff")
+    #
+    # CDK finally added a CI option so logs are sent to stdout.
+    #
+    # Stream the diff output straight into the result file and watch for
+    # the change markers on the way past, instead of buffering the whole
+    # output in memory and re-scanning it afterwards.
+    #
+    _returncode, _markers_seen = _stream_run(
+        ['poetry', 'run', 'cdk', 'diff', '--fail', '--ci', '--verbose'] + _app_args, outfile=_CDK_DIFF_FILE, env=aws_session_env, cwd=_CDK_PATH, markers=('[~]', '[+]', '[-]', '[=]'))
+    loggy.info("----------------------------------")
+    loggy.info(
+        f"cdk.diff(): CDK returned {str(_returncode)}")
+
+    #
+    # With --fail --ci the exit code already tells us the outcome for the
+    # common paths: 0 = no diff, 2 = diff found. Only an ambiguous code
+    # needs the streamed marker check to tell a diff from a CDK error.
+    #
+    if _returncode == 2:
+        loggy.info("cdk.diff(): CDK Diff found!")
+        _EXIT = True
+    elif _returncode != 0:
+        loggy.info("cdk.diff(): Testing for CDK Diff or Error.")
+
+        if _markers_seen:
+            loggy.info("cdk.diff(): CDK Diff found!")
+            _EXIT = True
+        else:
+            loggy.info("cdk.diff(): CDK ERROR!")
+            #
+            # JSON parse + YAML dump is CPU-bound and independent per
+            # stack, so render them all in parallel with libyaml and log
+            # the results in order.
+            #
+            # scandir gives us the type/size for free, letting us skip
+            # empty or non-file entries without the fnmatch pass or a
+            # stat per file that glob.glob costs.
+            #
+            # Fall back to the default cdk.out when the synth-once step
+            # failed and cdk synthesized its own assembly.
+            _out_dir = os.path.join(_CDK_PATH, _CDK_OUT)
+            if not os.path.isdir(_out_dir):
+                _out_dir = os.path.join(_CDK_PATH, 'cdk.out')
+            _stack_files = [
+                entry.path for entry in os.scandir(_out_dir)
+                if entry.name.endswith('.json') and entry.is_file() and entry.stat().st_size > 0]
+            with ThreadPoolExecutor() as executor:
+                for stack, _stack_yaml in zip(_stack_files, executor.map(_json_to_yaml, _stack_files)):
+                    loggy.info("----------------------------------")
+                    loggy.info("STACK: " + stack)
+                    loggy.info(_stack_yaml)
+            _EXIT = False
+
+    else:
+        # if 'DEPLOY_OVERRIDE' in os.environ.keys():
+        #     print("cdkDiff.__main__(): No CDK diff! Overriding CDK_DIFF because DEPLOY_OVERRIDE")
+        #     _EXIT = 0
+        # else:
+        with open(_CDK_DIFF_FILE, 'w') as file:
+            file.write(
+                "NO CDK diff found. This could be an AMI SSM Param change. Deploy proceding.")
+
+        loggy.info(
+            "cdk.diff(): NO CDK diff found. This could be an AMI SSM Param change. Deploy proceding.")
+        _EXIT = True
+
+    return _EXIT
+
+
+
+def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.html', verbose: bool = False) -> bool:
+
+    _CDK_DIFF_FILE = diff_file
+    _CDK_HTML_OUTPUT_FILE = output_file
+    _VERBOSE = verbose
 
     if _VERBOSE:
         loggy.info("diff_pretty()): BEGIN")
@@ -626,31 +862,33 @@ def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.ht
 
     #
     # This is a Hack to get rid of any warnings at the top of the output before
-    # we encounter our first `Stack xyz` line.
+    # we encounter our first `Stack xyz` line. One pass: keep a stack only if
+    # its first line actually appears in the raw output. (The old loop
+    # re-scanned all of cdk_out per stack and deleted while iterating, which
+    # skipped the entry after every deletion.)
     #
-    for idx, l in enumerate(stacks):
-        match = False
-        for hack_line in cdk_out.split('\n'):
-            if l.split('\n')[0] in hack_line:
-                match = True
-                break
-
-        if not match:
-            del stacks[idx]
-            continue
+    line_set = set(cdk_out.split('\n'))
+    stacks = [s for s in stacks if s.split('\n', 1)[0] in line_set]
 
     #
-    # Convert each `Stack xyz` line to our HTML format
+    # Convert each `Stack xyz` line to our HTML format, appending into one
+    # flat parts list joined exactly once at the end - per-stack joins plus a
+    # second outer join would build two full copies of the output.
+    #
+    output_parts: typing.List[str] = []
+    _append = output_parts.append
     #
+    # Verbose mode logs every line of every stack; buffer those and emit one
+    # loggy call after the loop instead of a write+flush per line.
+    #
+    _log_buf: typing.List[str] = []
     for idx, l in enumerate(stacks):
-        new_line = []
         diff_type = ""
         divs_open = 0
         ul_li_open = 0
         for ndx, n in enumerate(l.split('\n')):
             if _VERBOSE:
-                loggy.info(
-                    f"diff_pretty(): DEBUG: ({str(idx)})-({str(ndx)}) - {str(n)}")
+                _log_buf.append(f"diff_pretty(): DEBUG: ({idx})-({ndx}) - {n}")
 
             if ndx == 0:
                 # new_line.append(f"<div class=\"stack\"><h2>{n}</h2><div class=\"raw-diff\"><button onclick=\"accordion(this)\">Expand this Stack</button><div class=\"changes\">")
@@ -659,122 +897,95 @@ def diff_pretty(diff_file: str = 'cdk.diff.txt', output_file: str = 'cdk.diff.ht
                 # 2 open divs
                 #
                 divs_open += 2
-                new_line.append(
+                _append(
                     f"<div class=\"stack\"><h2>{n}</h2><button onclick=\"accordion(this)\">Expand this Stack</button><div class=\"changes\">")
             else:
-                if n.startswith('IAM Policy Changes'):
-                    diff_type = "IAM"
-                elif n.startswith('Resources'):
-                    diff_type = "Resources"
-                elif n.startswith('Outputs'):
-                    diff_type = "Outputs"
-                elif n.startswith('There were no differences'):
-                    diff_type = "NoDiff"
-
-                if 'Resources' in diff_type or 'Outputs' in diff_type:
-                    if n.startswith('[+]'):
-                        if ul_li_open > 0:
-                            ul_li_open = 0
-                            divs_open -= 1
-                            new_line.append('<pre></div></li></ul>')
-
-                        ul_li_open += 1
-                        divs_open += 1
-                        new_line.append(
-                            f"<ul class=\"actions\"><li class=\"create\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Addition</span></div><div class\"changes\"><pre>{n}")
-                    elif n.startswith('[-]'):
-                        if ul_li_open > 0:
-                            ul_li_open = 0
-                            divs_open -= 1
-                            new_line.append('</pre></div></li></ul>')
+                _section = _SECTION_TAGS.get(n.split(' ', 1)[0])
+                if _section and n.startswith(_section[0]):
+                    diff_type = _section[1]
 
-                        ul_li_open += 1
-                        divs_open += 1
-                        new_line.append(
-                            f"<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Delete</span></div><div class\"changes\"><pre>{n}")
-                    elif n.startswith('[~]'):
+                if diff_type == 'Resources' or diff_type == 'Outputs':
+                    handler = _HANDLERS.get(n[:3])
+                    if handler:
                         if ul_li_open > 0:
                             ul_li_open = 0
                             divs_open -= 1
-                            new_line.append('</pre></div></li></ul>')
+                            _append(_TPL_CLOSE)
 
                         ul_li_open += 1
                         divs_open += 1
-                        if 'replace' in n or ((len(l)-1) >= ndx+1 and 'replace' in l[ndx+1]):
-                            new_line.append(
-                                f"<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">REPLACEMENT</span></div><div class\"changes\"><pre>{n}")
-                        else:
-                            new_line.append(
-                                f"<ul class=\"actions\"><li class=\"update\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Update</span></div><div class\"changes\"><pre>{n}")
+                        if handler is _TPL_UPDATE and ('replace' in n or ((len(l)-1) >= ndx+1 and 'replace' in l[ndx+1])):
+                            handler = _TPL_REPLACE
+                        _append(handler.format(line=n))
 
                     else:
-                        new_line.append(f"{n}")
+                        _append(n)
 
-                elif 'IAM' in diff_type:
+                elif diff_type == 'IAM':
                     if divs_open <= 2:
                         ul_li_open += 1
                         divs_open += 1
-                        new_line.append(
-                            f"<ul class=\"actions\"><li class=\"update\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">Update</span></div><div class\"changes\"><pre>{n}")
+                        _append(_TPL_UPDATE.format(line=n))
                     else:
-                        new_line.append(f"{n}")
+                        _append(n)
 
-                elif 'NoDiff' in diff_type:
+                elif diff_type == 'NoDiff':
                     if divs_open <= 2:
                         ul_li_open += 1
                         divs_open += 1
-                        new_line.append(
-                            f"<ul class=\"actions\"><li class=\"read\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">No Diff</span></div><div class\"changes\"><pre>{n}")
+                        _append(_TPL_NO_DIFF.format(line=n))
                     else:
-                        new_line.append(f"{n}")
+                        _append(n)
 
-        while ul_li_open > 0:
-            ul_li_open -= 1
-            divs_open -= 1
-            new_line.append('</pre></div></li></ul>')
+        #
+        # Emit all outstanding closes with one string multiply per kind
+        # instead of a while/append per element.
+        #
+        if ul_li_open > 0:
+            divs_open -= ul_li_open
+            _append(_TPL_CLOSE * ul_li_open)
+            ul_li_open = 0
 
-        while divs_open > 0:
-            divs_open -= 1
-            new_line.append('</div>')
+        if divs_open > 0:
+            _append('</div>' * divs_open)
+            divs_open = 0
 
-        stacks[idx] = '\n'.join(new_line)
+    if _VERBOSE and _log_buf:
+        loggy.info('\n'.join(_log_buf))
 
     #
     # If there are no stacks, then we can print this as a giant error
     #
-    if not stacks:
+    if not output_parts:
         print(
             "cdk-diff-pretty.__main__(): ERROR: No stacks found. Outputting diff as ERROR.")
-        stacks.append(
+        _append(
             "<div class=\"stack\"><h2>CDK DIFF ERROR</h2><button onclick=\"accordion(this)\">Expand this Stack</button><div class=\"changes\">")
-        stacks.append("<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">CDK DIFF ERROR</span></div><div class\"changes\"><pre>")
-        stacks.append(f"{cdk_out}")
-        stacks.append('</pre></div></li></ul>')
-        stacks.append('</div></div>')
+        _append("<ul class=\"actions\"><li class=\"destroy\"><div class=\"summary\" onclick=\"accordion(this)\"><span class=\"badge\">CDK DIFF ERROR</span></div><div class\"changes\"><pre>")
+        _append(f"{cdk_out}")
+        _append('</pre></div></li></ul>')
+        _append('</div></div>')
 
-    html_template = html_template.replace(
-        '<h1>prettyplan</h1>', '<h1>CDK Diff</h1>')
-    html_template = html_template.replace(
-        '<title>prettyplan</title>', '<title>CDK Diff</title>')
-
-    html_template = html_template.replace(
-        '<div id="stacks"></div>', f"<div id=\"stacks\">{' '.join(stacks)}</div>")
+    html_template = _HTML_TEMPLATE.safe_substitute(
+        title='CDK Diff', h1='CDK Diff', stacks='\n'.join(output_parts))
 
     if _VERBOSE:
         loggy.info(
             f"diff_pretty(): Writing output file to {_CDK_HTML_OUTPUT_FILE}")
 
-    Path(_CDK_HTML_OUTPUT_FILE).write_text(html_template)
+    Path(_CDK_HTML_OUTPUT_FILE).write_bytes(html_template.encode('utf-8'))
     if _VERBOSE:
         loggy.info("diff_pretty(): END")
 
     return True
 
+@functools.lru_cache(maxsize=None)
 def verify_npm_installed() -> bool:
     """
     verify_npm_installed()
 
-    Ensure npm is installed, if not, install it.
+    Ensure npm is installed, if not, install it. Memoized - the check forks
+    shutil.which/apt and the answer cannot change mid-process.
     """
     loggy.info("cdk.verify_npm_installed(): BEGIN")
 
@@ -787,11 +998,14 @@ def verify_npm_installed() -> bool:
 
     return True
 
+@functools.lru_cache(maxsize=None)
 def get_cdk_installed_version() -> str:
     """
     get_cdk_installed_version()
 
-    Get the CDK installed version.
+    Get the CDK installed version. Memoized so repeat callers skip the
+    `cdk --version` fork; set_cdk_installed_version busts the cache after
+    installing a different version.
 
     Returns: String representing the installed version
     """
@@ -807,11 +1021,13 @@ def get_cdk_installed_version() -> str:
     
     return None
 
+@functools.lru_cache(maxsize=None)
 def get_python_version() -> str:
     """
     get_python_version()
 
-    Get the python installed version.
+    Get the python installed version. Memoized - one `python --version`
+    fork per process is plenty.
 
     Returns: String representing the installed version
     """
@@ -833,12 +1049,13 @@ def get_cdk_required_version() -> str:
 
     Get the CDK required version. If `cdk_lock_version` file exists, pulls the
     version value from there. Otherwise, returns the installed version of CDK.
+    The file read is cached keyed on its mtime so edits still take effect.
 
     Returns: String representing the required version
     """
     loggy.info("cdk.get_cdk_required_version(): BEGIN")
     if os.path.exists('cdk_lock_version'):
-        _CDK_REQUIRED_VERSION = Path('cdk_lock_version').read_text().strip()
+        _CDK_REQUIRED_VERSION = __read_cdk_lock_version(os.path.getmtime('cdk_lock_version'))
     else:
         _CDK_REQUIRED_VERSION = get_cdk_installed_version()
 
@@ -846,6 +1063,71 @@ def get_cdk_required_version() -> str:
     return _CDK_REQUIRED_VERSION
 
 
+@functools.lru_cache(maxsize=None)
+def __read_cdk_lock_version(mtime: float) -> str:
+    return Path('cdk_lock_version').read_text().strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_cdk_version() -> str:
+    """
+    _cached_cdk_version()
+
+    Process-scoped memo of set_cdk_installed_version(). The installed CDK
+    cannot change underneath one run unless we install it ourselves, so
+    repeat callers (install_cdk_requirements per env) skip the npm/node
+    forks entirely.
+    """
+    return set_cdk_installed_version()
+
+
+def clear_caches():
+    """
+    clear_caches()
+
+    Drop every memoized lookup in this module. Mainly for test isolation.
+    """
+    for fn in (verify_npm_installed, get_cdk_installed_version, get_python_version,
+               __read_cdk_lock_version, _find_cdk_json, _cached_cdk_version,
+               _split_install_cmd):
+        fn.cache_clear()
+    _poetry_env_ready.clear()
+
+
+def _invalidate_version_cache():
+    """
+    _invalidate_version_cache()
+
+    Drop the memoized version lookups after `npm install -g` swaps the
+    installed CDK, so the next read reflects the new binary.
+    """
+    get_cdk_installed_version.cache_clear()
+    __read_cdk_lock_version.cache_clear()
+
+
+#
+# Marker recording the last version this host installed/verified, shared
+# across processes in the same CI job so only the first one pays the
+# `cdk --version` Node cold start.
+#
+_CDK_VERSION_MARKER = Path('/tmp/.cdk-version-installed')
+
+
+def __cdk_version_marker_read() -> typing.Optional[str]:
+    """
+    __cdk_version_marker_read()
+
+    Return the marker's version string, or None when the marker is missing
+    or older than cdk_lock_version (a newer lock means it may be stale).
+    """
+    try:
+        if os.path.exists('cdk_lock_version') and os.path.getmtime('cdk_lock_version') > _CDK_VERSION_MARKER.stat().st_mtime:
+            return None
+        return _CDK_VERSION_MARKER.read_text().strip()
+    except OSError:
+        return None
+
+
 def set_cdk_installed_version() -> str:
     """
     set_cdk_installed_version()
@@ -865,6 +1147,10 @@ def set_cdk_installed_version() -> str:
     if not _CDK_REQUIRED_VERSION:
       _CDK_REQUIRED_VERSION = 'latest'
 
+    if __cdk_version_marker_read() == _CDK_REQUIRED_VERSION:
+        loggy.info("cdk.set_cdk_installed_version(): Marker shows %s already installed. Skipping version check.", _CDK_REQUIRED_VERSION)
+        return _CDK_REQUIRED_VERSION
+
     _CDK_INSTALLED_VERSION = get_cdk_installed_version()
 
     if _CDK_REQUIRED_VERSION:
@@ -877,33 +1163,137 @@ def set_cdk_installed_version() -> str:
     if _CDK_REQUIRED_VERSION != _CDK_INSTALLED_VERSION:
         subprocess.run(['sudo', 'npm', 'install', '-g', 'aws-cdk@' + _CDK_REQUIRED_VERSION],
                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        _invalidate_version_cache()
+
+    try:
+        _CDK_VERSION_MARKER.write_text(_CDK_REQUIRED_VERSION)
+    except OSError as e:
+        loggy.warn("cdk.set_cdk_installed_version(): Could not write version marker: %s", e)
 
     loggy.info("cdk.set_cdk_installed_version(): END")
     return _CDK_REQUIRED_VERSION
 
-def bootstrap_cdk_environment(cdk_lang: str, aws_session_env: dict, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+def _use_poetry(cwd: typing.Optional[str] = None) -> bool:
+    """
+    _use_poetry()
+
+    Mirror install_cdk_requirements()'s detection: cdk commands run under
+    `poetry run` when the project is poetry-managed. The orb's
+    poetry_install_cmd parameter defaults to "" even for poetry projects, so
+    the install command's truthiness says nothing about whether a venv is in
+    play.
+    """
+    _dir = cwd or os.getcwd()
+    return os.path.exists(os.path.join(_dir, 'pyproject.toml')) and os.path.exists(os.path.join(_dir, 'poetry.lock'))
+
+
+def synth_cloud_assembly(aws_session_env: typing.Optional[dict], poetry_install_cmd: typing.Optional[str] = None, cwd: typing.Optional[str] = None, output: typing.Optional[str] = None) -> bool:
+    """
+    synth_cloud_assembly()
+
+    Synthesize the cloud assembly once, so that the deploy/diff that follows
+    can be pointed at it with `--app` instead of paying a second full synth
+    (Node startup + app execution) per cdk command.
+
+    aws_session_env: dict containing the environment for the cdk subprocess,
+        or None to inherit the current process environment
+    cwd: String (Optional) directory to run the synth in
+    output: String (Optional) assembly output dir, defaults to cdk.out
+
+    Returns: True/False
+    """
+    loggy.info("cdk.synth_cloud_assembly(): BEGIN")
+    POETRY = "poetry run " if _use_poetry(cwd) else ""
+    CDK_SYNTH_CMD = f"{POETRY}cdk synth --all --quiet".split(' ')
+    if output:
+        CDK_SYNTH_CMD += ['--output', output]
+
+    process_output = subprocess.run(
+        CDK_SYNTH_CMD, check=False, env=aws_session_env, cwd=cwd)
+
+    loggy.info("cdk.synth_cloud_assembly(): END")
+    return process_output.returncode == 0
+
+
+def bootstrap_cdk_environment(cdk_lang: str, aws_session_env: typing.Optional[dict], poetry_install_cmd: typing.Optional[str] = None, cwd: typing.Optional[str] = None) -> bool:
     """
     bootstrap_cdk_environment()
 
     Ensure the AWS account has been bootstrapped.
 
     cdk_lang: String representing the type of CDK code to deploy
+    cwd: String (Optional) directory to run the bootstrap in; defaults to the
+        current directory. Pass this instead of chdir'ing when other threads
+        are working in a different directory.
 
     Returns: True/False
     """
     loggy.info("cdk.bootstrap_cdk_environment(): BEGIN - Force bootstrapping")
-    POETRY = "poetry run " if poetry_install_cmd else ""
+    POETRY = "poetry run " if _use_poetry(cwd) else ""
     # Run Bootstrap to ensure it's up to date
     CDK_BOOTSTRAP_CMD = f"{POETRY}cdk bootstrap".split(' ')
 
     # Dont check, just run the stupid thing
     subprocess.run(
-      CDK_BOOTSTRAP_CMD, check=False, env=aws_session_env)
+      CDK_BOOTSTRAP_CMD, check=False, env=aws_session_env, cwd=cwd)
 
     loggy.info("cdk.bootstrap_cdk_environment(): END")
     return True
 
 
+def _parallel_download(reqs: typing.List[str], cache_dir: str, workers: typing.Optional[int] = None) -> None:
+    """
+    _parallel_download()
+
+    Warm a local wheel cache by downloading each requirement concurrently.
+    pip downloads are network-bound, so N parallel `pip download --no-deps`
+    workers overlap the round-trips; the caller then runs one batch install
+    pointed at the cache.
+
+    reqs: List of requirement strings (one per requirements.txt line)
+    cache_dir: Directory to download wheels into
+    """
+    workers = workers or min(8, (os.cpu_count() or 4) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                subprocess.run,
+                ['pip', 'download', '--no-deps', '-d', cache_dir, req],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+            for req in reqs]
+        for future in futures:
+            future.result()
+
+
+def _apply_cdk_version_patches(text: str, version: str) -> str:
+    """
+    _apply_cdk_version_patches()
+
+    Pin the aws cdk requirements in a setup.py's contents to the required
+    version using the precompiled patch table.
+
+    TAW 20220529 - Setting required version changes between cdk v1 and v2
+
+    text: String with the setup.py contents
+    version: String with the required CDK version
+
+    Returns: String with the patched contents
+    """
+    _patches = _SETUP_PY_PATCHES.get(version[:1])
+    if not _patches:
+        loggy.info(
+            "cdk.install_cdk_requirements(): Detected unknown cdk version. You might need to modify cdk.py in gocd library to support this.")
+        return text
+
+    loggy.info(
+        "cdk.install_cdk_requirements(): Detected cdk v%s. Pinning aws cdk requirements to %s.",
+        version[:1], version)
+    for _pattern, _repl in _patches:
+        text = _pattern.sub(_repl.format(v=version), text)
+
+    return text
+
+
 def install_cdk_requirements(cdk_lang: str, poetry_install_cmd: typing.Optional[str] = None) -> bool:
     """
     install_cdk_requirements()
@@ -915,7 +1305,7 @@ def install_cdk_requirements(cdk_lang: str, poetry_install_cmd: typing.Optional[
     Returns: True/False
     """
     loggy.info("cdk.install_cdk_requirements(): BEGIN")
-    _cdk_required_version = set_cdk_installed_version()
+    _cdk_required_version = _cached_cdk_version()
     if cdk_lang == 'python':
         loggy.info(
             "cdk.install_cdk_requirements(): Installing python requirements.")
@@ -926,64 +1316,58 @@ def install_cdk_requirements(cdk_lang: str, poetry_install_cmd: typing.Optional[
 
             python_version = get_python_version()
 
-            subprocess.run(
-                ['poetry', 'env', 'use', python_version], check=True)
+            _ensure_poetry_env(python_version)
 
             #
-            # Grab poetry_install_cmd and convert it to a list
+            # Grab poetry_install_cmd and convert it to an argv - the default
+            # is a module-level tuple and user-supplied commands are tokenized
+            # once per distinct string.
             #
-            _POETRY_INSTALL_CMD = poetry_install_cmd
-            if not _POETRY_INSTALL_CMD:
-              _POETRY_INSTALL_CMD = "poetry install".split(' ')
+            if not poetry_install_cmd:
+              _POETRY_INSTALL_CMD = _DEFAULT_POETRY_INSTALL
             else:
-              _POETRY_INSTALL_CMD = _POETRY_INSTALL_CMD.split(' ')
+              _POETRY_INSTALL_CMD = _split_install_cmd(poetry_install_cmd)
 
             subprocess.run(
-                _POETRY_INSTALL_CMD, check=True)
+                list(_POETRY_INSTALL_CMD), check=True)
 
         elif os.path.exists('requirements.txt'):
             loggy.info(
                 "cdk.install_cdk_requirements(): Installing pips from requirements.txt file.")
 
+            #
+            # Download the pinned requirements in parallel into a wheel
+            # cache, then let a single pip process install the batch. The
+            # cache is only a hint (--find-links, not --no-index) so
+            # transitive deps still resolve normally.
+            #
+            _reqs = [
+                _line.strip() for _line in Path('requirements.txt').read_text().splitlines()
+                if _line.strip() and not _line.strip().startswith('#')]
+            _cache_dir = '/tmp/pip-wheel-cache'
+            os.makedirs(_cache_dir, exist_ok=True)
+            _parallel_download(_reqs, _cache_dir)
+
             subprocess.run(
-                ['pip', 'install', '-r', 'requirements.txt'], check=True)
+                ['pip', 'install', '--find-links', _cache_dir, '-r', 'requirements.txt'], check=True)
 
         elif os.path.exists('setup.py'):
             loggy.info(
                 "cdk.install_cdk_requirements(): Install from setup.py file.")
 
-            _file_contents = Path('setup.py').read_text()
-            loggy.info(_file_contents)
-
             #
-            # TAW 20220529 - Setting required version changes between cdk v1 and v2
+            # Single read, patch in memory, one atomic write via os.replace;
+            # no post-write re-read just for logging.
             #
-            if _cdk_required_version.startswith('1'):
-                loggy.info(
-                    "cdk.install_cdk_requirements(): Detected cdk v1. Adding version number to aws_cdk.aws_*.")
-                _file_contents = re.sub(
-                    'aws_cdk.aws_(.*)"', r'aws_cdk.aws_\1=='+_cdk_required_version+'"', _file_contents)
-            elif _cdk_required_version.startswith('2'):
-                loggy.info(
-                    "cdk.install_cdk_requirements(): Detected cdk v2. Adding version number to aws-cdk-lib*.")
-                _file_contents = re.sub(
-                    'aws-cdk-lib(.*)"', r'aws-cdk-lib\1=='+_cdk_required_version+'"', _file_contents)
-                _file_contents = re.sub(
-                    'aws_cdk_lib(.*)"', r'aws_cdk_lib\1=='+_cdk_required_version+'"', _file_contents)
-            else:
-                loggy.info(
-                    "cdk.install_cdk_requirements(): Detected unknown cdk version. You might need to modify cdk.py in gocd library to support this.")
-
-            with open('setup.py', 'w') as file:
-                file.write(_file_contents)
+            _file_contents = _apply_cdk_version_patches(
+                Path('setup.py').read_text(), _cdk_required_version)
 
-            # subprocess.run(['sed', '-i', '-E', '\'s|aws_cdk.aws_(.*)"|aws_cdk.aws_\1=='+_cdk_required_version+'"|g\'', 'setup.py'], check=True)
-            # sed -i -E 's|aws_cdk.aws_(.*)"|aws_cdk.aws_\1=='$_CDK_REQUIRED_VERSION'"|g' setup.py
+            Path('setup.py.tmp').write_text(_file_contents)
+            os.replace('setup.py.tmp', 'setup.py')
 
             loggy.info(
                 "cdk.install_cdk_requirements(): Modified setup.py file.")
-            _new_file_contents = Path('setup.py').read_text()
-            loggy.info(_new_file_contents)
+            loggy.info(_file_contents)
 
             subprocess.run(
                 ['pip3', 'install', '-e', '.'], check=True)
@@ -1005,6 +1389,29 @@ def install_cdk_requirements(cdk_lang: str, poetry_install_cmd: typing.Optional[
     return True
 
 
+#
+# Directories that can hold thousands of files but never our cdk.json.
+#
+_CDK_SEARCH_PRUNE = {'node_modules', '.git', 'cdk.out', '.venv', 'venv', '__pycache__'}
+
+
+@functools.lru_cache(maxsize=8)
+def _find_cdk_json(cwd: str) -> str:
+    """
+    _find_cdk_json()
+
+    Walk the tree looking for a cdk.json, pruning dependency/output dirs the
+    recursive glob used to wade through. Memoized per cwd since deploy() and
+    diff() both search in the same CI job.
+    """
+    for root, dirs, files in os.walk(cwd):
+        dirs[:] = [d for d in dirs if d not in _CDK_SEARCH_PRUNE]
+        if 'cdk.json' in files:
+            return os.path.relpath(root, cwd)
+
+    raise FileNotFoundError(f"No cdk.json found under {cwd}")
+
+
 def get_cdk_path(path: typing.Optional[str]) -> str:
     if path is not None:
         return path
@@ -1014,6 +1421,5 @@ def get_cdk_path(path: typing.Optional[str]) -> str:
     if cdk_path_env is not None:
         return cdk_path_env
 
-    return os.path.dirname(
-        glob.glob('**/cdk.json', recursive=True)[0])
+    return _find_cdk_json(os.getcwd())
 
@@ -7,13 +7,15 @@ Common functions
 Example Usage:
     from utils import common
 """
+import functools
 import os
+import re
 import sys
+import threading
+import time
 import typing
 import subprocess
-from subprocess_tee import run
 from shlex import join  # type: ignore
-import requests
 
 if typing.TYPE_CHECKING:
     CompletedProcess = subprocess.CompletedProcess[typing.Any]  # pylint: disable=E1136
@@ -24,6 +26,38 @@ sys.path.insert(0, '/home/circleci/bin')
 
 import loggy
 
+#
+# Matches `export NAME=value` lines in a BASH_ENV file; one multiline sweep
+# over the whole file beats per-line readlines + double split, and the greedy
+# value group handles values containing '='.
+#
+_EXPORT_RE = re.compile(r'^export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$', re.M)
+
+#
+# Pipeline variable forms: ${NAME} possibly embedded in other text, or a bare
+# $NAME on its own. Compiled once at import instead of per call.
+#
+_VAR_RE = re.compile(r'\$\{([^}]+)\}')
+_SIMPLE_VAR_RE = re.compile(r'^\$([A-Za-z_][A-Za-z0-9_]*)$')
+
+#
+# One shared session for CircleCI API calls - keep-alive skips the TLS
+# handshake on repeat calls and the adapter retries transient 429/503s
+# with backoff instead of failing the workflow outright. Built lazily so
+# scripts that never hit the API skip the requests import at startup.
+#
+@functools.lru_cache(maxsize=1)
+def _get_cci_session():
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+    _s = requests.Session()
+    _s.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503])))
+    return _s
+
+
+# Only dump the (huge) environment once per process on cancel failures.
+_environ_dumped = False
+
 
 class ChDir(object):
     def __init__(self, path):
@@ -37,17 +71,22 @@ class ChDir(object):
         os.chdir(self.old_dir)
 
 def cancel_workflow() -> bool:
+    global _environ_dumped
     _CIRCLE_WORKFLOW_ID = get_environ('CIRCLE_WORKFLOW_ID')
     _PIPELINE_TRIGGER_TOKEN = get_environ('PIPELINE_TRIGGER_TOKEN')
     if not _CIRCLE_WORKFLOW_ID or not _PIPELINE_TRIGGER_TOKEN:
         loggy.info("common.cancel_workflow(): Pipeline error. One of CIRCLE_WORKFLOW_ID or PIPELINE_TRIGGER_TOKEN not set on environment.")
-        loggy.info("Dumping available ENV vars for debugging:")
-        for key, value in os.environ.items():
-            loggy.info(f"{key}={value}")
+        if not _environ_dumped:
+            _environ_dumped = True
+            #
+            # One record for the whole dump - a loggy.info per variable takes
+            # the logging lock and flushes hundreds of times.
+            #
+            loggy.info("Dumping available ENV vars for debugging:\n" + "\n".join(f"{key}={value}" for key, value in sorted(os.environ.items())))
         return False
 
     loggy.info(f"common.cancel_workflow(): Cancelling workflow: https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}/cancel")
-    x = requests.post(f"https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}/cancel", headers={"Circle-Token": _PIPELINE_TRIGGER_TOKEN})
+    x = _get_cci_session().post(f"https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}/cancel", headers={"Circle-Token": _PIPELINE_TRIGGER_TOKEN})
     if x.status_code != 202:
         loggy.info(f"common.cancel_workflow():  ERROR canceling workflow. {x.text}")
         return False
@@ -87,24 +126,18 @@ def resolve_pipeline_variable(param):
 
     Returns: String containing resolved env variable or original param if it can't resolve
     """
-    _param = None
-
-    if "${" in param and "}" in param:
-        if param.startswith("${") and param.endswith("}"):
-            _param = removeprefix(param, "${")
-            _param = removesuffix(_param, "}")
-            _param = os.environ.get(_param, None)
-        else:
-            m = re.search('\\$\\{(.+?)\\}', param)
-            if m:
-                found = m.group(1)
-                _param = os.environ.get(found, None)
-                _param = _param if _param is None else param.replace("${" + found + "}", _param)
-    elif param.startswith("$"):
-        _param = removeprefix(param, "$")
-        _param = os.environ.get(_param, None)
-
-    return _param if _param is not None else param
+    if "${" in param:
+        #
+        # One substitution pass handles all ${NAME} occurrences; unknown
+        # variables are left as-is so the original text survives.
+        #
+        return _VAR_RE.sub(lambda m: os.environ.get(m.group(1), m.group(0)), param)
+
+    m = _SIMPLE_VAR_RE.match(param)
+    if m:
+        return os.environ.get(m.group(1), param)
+
+    return param
 
 def add_bash_exports_to_env(file: typing.Optional[str] = None) -> bool:
     """
@@ -124,11 +157,10 @@ def add_bash_exports_to_env(file: typing.Optional[str] = None) -> bool:
     if file and os.path.exists(file):
         if os.stat(file).st_size != 0:
             with open(file, 'r') as _BASH_ENV:
-                for _line in _BASH_ENV.readlines():
-                    if _line.startswith('export'):
-                        loggy.info(f"add_bash_exports_to_env(): Adding ({_line}) to os.environ")
-                        _var, _val = _line.strip().split('export ', 1)[1].split('=', 1)[:2]
-                        os.environ[_var] = _val.strip('"')
+                _text = _BASH_ENV.read()
+            for _m in _EXPORT_RE.finditer(_text):
+                loggy.info(f"add_bash_exports_to_env(): Adding ({_m.group(0)}) to os.environ")
+                os.environ[_m.group(1)] = _m.group(2).strip().strip('"')
 
     return True
 
@@ -146,10 +178,27 @@ def push_export_to_env(export_name: str, export_value: str, file: typing.Optiona
     """
     loggy.info("push_export_to_env(): BEGIN")
 
+    return push_exports_to_env({export_name: export_value}, file=file)
+
+
+def push_exports_to_env(exports: typing.Dict[str, str], file: typing.Optional[str] = None) -> bool:
+    """
+    push_exports_to_env()
+
+    Push several exports to an environment file in one open/write, instead of
+    paying an open+write per variable via push_export_to_env in a loop.
+
+    exports: dict mapping variable names to values
+    file: (Optional) Path to file with exports inside. Will default to BASH_ENV for circleCI
+
+    Returns: True/False
+    """
+    loggy.info("push_exports_to_env(): BEGIN")
+
     if not file:
         file = os.environ.get('BASH_ENV')
-    with open(os.environ.get('BASH_ENV'), "a") as _SAVE_BASH_ENV:
-        _SAVE_BASH_ENV.write(f"export {export_name}=\"{export_value}\"\n")
+    with open(file, "a") as _SAVE_BASH_ENV:
+        _SAVE_BASH_ENV.write("".join(f"export {_name}=\"{_value}\"\n" for _name, _value in exports.items()))
     return True
 
 
@@ -161,6 +210,9 @@ def subprocess_run(args: typing.Union[str, typing.List[str]], **kwargs: typing.A
 
     * Usage: common.subprocess_run("make install")
     """
+    # Deferred: subprocess_tee drags in asyncio, which short scripts that
+    # never shell out through this helper shouldn't pay for at import time.
+    from subprocess_tee import run
 
     if isinstance(args, str):
         cmd = args
@@ -185,14 +237,30 @@ def subprocess_run(args: typing.Union[str, typing.List[str]], **kwargs: typing.A
     return _process_output
     
 
+def _heartbeat(proc: subprocess.Popen, delay: int, limit: int) -> None:
+    """
+    _heartbeat()
+
+    Daemon-thread heartbeat for subprocess_long: logs while the child is
+    still running so pipelines don't kill the job for producing no output.
+    """
+    elapsed = 0
+    while proc.poll() is None and elapsed < limit:
+        time.sleep(delay)
+        elapsed += delay
+        if proc.poll() is None:
+            loggy.info(f"common.subprocess_long(): LONG RUNNING PROCESS ENABLED - Running for {elapsed} of {limit} seconds.")
+
+
 def subprocess_long(args: typing.Union[str, typing.List[str]], timeout=None, delay=None, check=None, shell=None, env=None):
     """
     subprocess_long():
 
-    imports subprocess_tee
-
-    Run long-running commands that are wrapped into a continuous loggy.info statement to keep
-    pipelines from exiting on zero output back to the GoCD server.
+    Run long-running commands with a heartbeat thread in this process that
+    logs a continuous loggy.info statement to keep pipelines from exiting on
+    zero output back to the GoCD server. (This used to wrap the command in a
+    bash while/sleep/echo loop, which cost an extra shell + subshell per call
+    and forced every list argument through shell parsing.)
 
     * Usage: common.subprocess_long(cmd="make install", timeout=15, delay=5, check=True)
 
@@ -200,7 +268,8 @@ def subprocess_long(args: typing.Union[str, typing.List[str]], timeout=None, del
     delay defaults to 10 seconds
     check defaults to False, use returned output.returncode to check for failure.
         (Set to True if you want this function to error on command failure instead)
-    shell defaults to False
+    shell defaults to False; string commands always run through the shell,
+        lists run directly without one
     env defaults to None
     """
     timeout = 30 if timeout is None else timeout
@@ -210,27 +279,66 @@ def subprocess_long(args: typing.Union[str, typing.List[str]], timeout=None, del
 
     if isinstance(args, str):
         cmd = args
-    else:
-        # run was called with a list instead of a single item but asyncio
-        # create_subprocess_shell requires command as a single string, so
-        # we need to convert it to string
+        shell = True
+    elif shell:
+        # Caller wants shell features with a list - join it once, safely
         cmd = join(args)
+    else:
+        cmd = args
 
-    longRunningProcessStart = 'counter=0; while [ $counter -lt ' + \
-        str(timeout*60) + \
-        ' ]; do counter=$((counter+' + \
-        str(delay) + \
-        ')); sleep ' + \
-        str(delay) + \
-        '; echo "common.subprocess_long(): LONG RUNNING PROCESS ENABLED - Running for $counter of ' + \
-        str(timeout*60) + \
-        ' seconds."; done & export _LONG_RUNNING_PROCESS=$!; '
+    proc = subprocess.Popen(cmd, shell=shell, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    threading.Thread(target=_heartbeat, args=(proc, delay, timeout * 60), daemon=True).start()
+
+    try:
+        _stdout, _stderr = proc.communicate(timeout=timeout * 60)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        _stdout, _stderr = proc.communicate()
 
-    longRunningProcessStop = '; retcode=$?; kill $_LONG_RUNNING_PROCESS; exit $retcode'
+    _process_output = CompletedProcess(args=cmd, returncode=proc.returncode, stdout=_stdout, stderr=_stderr)
 
-    _process_output = run(longRunningProcessStart + cmd + longRunningProcessStop, env=env, shell=shell, check=check)
+    if check and proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=_stdout, stderr=_stderr)
 
-    # loggy.info(_process_output.stdout)
-    # loggy.info(_process_output.stderr)
-    # loggy.info(_process_output.returncode)
     return _process_output
+
+
+def subprocess_stream(args: typing.List[str], outfile: str, env=None, cwd=None, markers=None):
+    """
+    subprocess_stream():
+
+    Run a command with stdout/stderr merged and streamed line-by-line straight
+    into outfile instead of buffering the whole output in memory and writing
+    it afterwards. Lines are echoed through loggy as they arrive, which also
+    keeps the pipeline from timing out on silence.
+
+    markers: optional iterable of substrings to watch for while the lines
+        stream past (e.g. cdk diff change markers).
+
+    Returns: (returncode, seen) where seen is the set of markers observed
+    """
+    markers = tuple(markers or ())
+    seen = set()
+
+    #
+    # The outfile is opened lazily on the first line (with a wide buffer to
+    # batch the writes) so a command that produces no output doesn't
+    # create/truncate an empty file.
+    #
+    file = None
+    try:
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env, cwd=cwd)
+        for line in process.stdout:
+            if file is None:
+                file = open(outfile, 'w', buffering=1 << 16)
+            file.write(line)
+            loggy.info(line.rstrip('\n'))
+            for marker in markers:
+                if marker in line:
+                    seen.add(marker)
+        process.wait()
+    finally:
+        if file is not None:
+            file.close()
+
+    return process.returncode, seen
@@ -11,6 +11,7 @@ Example Usage:
 import os
 import sys
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, '/home/circleci/bin')
 
@@ -19,6 +20,49 @@ from common import subprocess_long as _long_run
 
 import subprocess
 
+#
+# Only log the agent keys once per process - ssh-add is a fork per call and
+# the answer doesn't change mid-run.
+#
+_ssh_keys_logged = False
+
+#
+# Answers from check_exists_locally, keyed on (container, tag). Mutating
+# commands run through docker() clear it; callers doing out-of-band docker
+# rmi/build must call invalidate_image_cache() themselves.
+#
+_IMG_CACHE: typing.Dict[typing.Tuple[str, str], bool] = {}
+
+# docker subcommands that can change which images exist locally.
+_IMG_MUTATORS = {'pull', 'push', 'build', 'tag', 'rmi', 'load', 'import'}
+
+
+def invalidate_image_cache() -> None:
+    """
+    invalidate_image_cache()
+
+    Forget every cached check_exists_locally answer. Call this after changing
+    local images outside of this module (e.g. a raw `docker rmi`).
+    """
+    _IMG_CACHE.clear()
+
+
+def _log_ssh_keys() -> None:
+    """
+    _log_ssh_keys()
+
+    Log the ssh-agent's loaded keys for debugging ssh builds, at most once
+    per process.
+    """
+    global _ssh_keys_logged
+    if _ssh_keys_logged:
+        return
+    _ssh_keys_logged = True
+
+    ssh_add_output = subprocess.run(["ssh-add", "-L"], capture_output=True, text=True, check=False)
+    loggy.info(f"docker._log_ssh_keys(): ssh-add output: {ssh_add_output.stdout}")
+    loggy.info(f"docker._log_ssh_keys(): ssh-add return: {str(ssh_add_output.returncode)}")
+
 
 def docker(*args, env=None, ssh=None) -> bool:
     """
@@ -49,34 +93,91 @@ def docker(*args, env=None, ssh=None) -> bool:
         # Add --ssh default to the docker build command
         cmd.append("--ssh")
         cmd.append(f"default={os.environ.get('SSH_AUTH_SOCK')}")
-    
+
+        # Show me the ssh-add output (first ssh build only)
+        _log_ssh_keys()
 
     #
-    # Show me the ssh-add output
+    # Hand the argv list straight to subprocess_long - no shell, so arguments
+    # with spaces survive and we skip the extra shell fork. The join is only
+    # for the log line.
     #
-    # ssh_add_output = subprocess.run(["ssh-add", "-L"], capture_output=True, text=True)
-    # loggy.info(f"docker.docker(): ssh-add output: {ssh_add_output.stdout}")
-    # loggy.info(f"docker.docker(): ssh-add stderr: {ssh_add_output.stderr}")
-    # loggy.info(f"docker.docker(): ssh-add return: {str(ssh_add_output.returncode)}")
-
-    loggy.info(f"docker.docker(): stdout: {' '.join(cmd)}")
+    loggy.info(f"docker.docker(): command: {' '.join(cmd)}")
     if env and isinstance(env, dict):
         loggy.info(f"docker.docker(): Running with specific environment variables.")
-        output = _long_run(' '.join(cmd), check=False, env=env)
+        output = _long_run(cmd, check=False, env=env)
     else:
-        output = _long_run(' '.join(cmd), check=False)
+        output = _long_run(cmd, check=False)
 
-    loggy.info(f"docker.docker(): stdout: {output.stdout}")
-    loggy.info(f"docker.docker(): stderr: {output.stderr}")
-    loggy.info(f"docker.docker(): return: {str(output.returncode)}")
+    loggy.info("docker.docker(): stdout: %s", loggy.preview(output.stdout))
+    loggy.info("docker.docker(): stderr: %s", loggy.preview(output.stderr))
+    loggy.info("docker.docker(): return: %s", output.returncode)
 
     if output.returncode != 0:
         loggy.info("docker.docker(): Error.")
         return False
 
+    # Local images may have changed - drop stale existence answers.
+    if len(cmd) > 1 and cmd[1] in _IMG_MUTATORS:
+        invalidate_image_cache()
+
+    return True
+
+
+def docker_batch(commands: typing.List[typing.List[str]]) -> bool:
+    """
+    docker_batch()
+
+    Run several independent docker commands in one shell invocation joined
+    with &&, instead of paying a docker CLI startup per command.
+
+    Example: docker_batch([["tag", "api:123", "api:latest"], ["push", "api:latest"]])
+
+    commands: List of docker argv lists (without the leading "docker")
+
+    Returns: True/False (False as soon as any command in the chain fails)
+    """
+    cmd = " && ".join("docker " + " ".join(c) for c in commands)
+    loggy.info(f"docker.docker_batch(): {cmd}")
+
+    output = _long_run(cmd, check=False)
+    loggy.info("docker.docker_batch(): stdout: %s", loggy.preview(output.stdout))
+    loggy.info("docker.docker_batch(): stderr: %s", loggy.preview(output.stderr))
+    loggy.info("docker.docker_batch(): return: %s", output.returncode)
+
+    if output.returncode != 0:
+        loggy.info("docker.docker_batch(): Error.")
+        return False
+
+    if any(c and c[0] in _IMG_MUTATORS for c in commands):
+        invalidate_image_cache()
+
     return True
 
 
+def docker_parallel(arg_lists: typing.List[typing.List[str]], max_workers: int = 4) -> typing.List[bool]:
+    """
+    docker_parallel()
+
+    Run several independent docker commands concurrently in a thread pool so
+    network-bound operations (pull/push of distinct images) overlap instead of
+    running back to back.
+
+    Only use this for order-independent commands - there is no guarantee which
+    finishes first.
+
+    Example: docker_parallel([["pull", "api:123"], ["pull", "web:123"]])
+
+    arg_lists: List of docker argv lists (without the leading "docker")
+    max_workers: Max concurrent commands
+
+    Returns: List of True/False results, in the same order as arg_lists
+    """
+    loggy.info(f"docker.docker_parallel(): Running {len(arg_lists)} docker commands with {max_workers} workers")
+    with ThreadPoolExecutor(max_workers=max_workers) as _executor:
+        return list(_executor.map(lambda _args: docker(*_args), arg_lists))
+
+
 def check_exists_locally(container, tag) -> bool:
     """
     check_exists_locally()
@@ -94,18 +195,25 @@ def check_exists_locally(container, tag) -> bool:
         loggy.info(f"docker.check_exists_locally(): Container and tag are required.")
         return False
 
-    cmd = ["docker"] + ["images", f"{container}:{tag}"]
-    loggy.info(f"docker.check_exists_locally(): stdout: {' '.join(cmd)}")
-    output = _long_run(' '.join(cmd), check=False)
-    loggy.info(f"docker.check_exists_locally(): stdout: {output.stdout}")
-    loggy.info(f"docker.check_exists_locally(): stderr: {output.stderr}")
+    _key = (container, tag)
+    if _key in _IMG_CACHE:
+        loggy.info(f"docker.check_exists_locally(): Cached answer: {_IMG_CACHE[_key]}")
+        return _IMG_CACHE[_key]
+
+    #
+    # `image inspect` is a direct lookup inside dockerd and answers with its
+    # exit code, so there is no image listing to parse.
+    #
+    cmd = ["docker", "image", "inspect", f"{container}:{tag}"]
+    loggy.info(f"docker.check_exists_locally(): {' '.join(cmd)}")
+    output = _long_run(cmd, check=False)
     loggy.info(f"docker.check_exists_locally(): return: {str(output.returncode)}")
 
-    if f"{container}" not in output.stdout:
+    _IMG_CACHE[_key] = output.returncode == 0
+    if not _IMG_CACHE[_key]:
         loggy.info("docker.check_exists_locally(): Container not found locally.")
-        return False
 
-    return True
+    return _IMG_CACHE[_key]
 
 
 def tag(container, tag) -> bool:
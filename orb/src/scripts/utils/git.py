@@ -43,17 +43,25 @@ def changes_by_path(path: str, from_commit: typing.Optional[str] = "HEAD^") -> b
               git.changes_by_path(path="^app/.*") <<<< single path
     """    
     loggy.info(f"git.changes_by_path(): Checking for changes from commit ({from_commit}) to checked out commit.")
-    
-    o = _run(f"git diff {from_commit} HEAD --name-only", capture_output=True)
+
+    #
+    # -z gives NUL-separated, unquoted filenames so paths with spaces or
+    # newlines match correctly.
+    #
+    o = _run(f"git diff {from_commit} HEAD --name-only -z", capture_output=True)
 
     if o.returncode == 0:
-        loggy.info(f"git.changes_by_path(): Commited files list: \n{o.stdout}")
-        for line in o.stdout.split('\n'):
-            for p in path.split(' '):
-                match = re.search(p, line)
-                if match:
-                    loggy.info(f"git.changes_by_path(): Change in required path found. {line}")
-                    return True
+        _files = [f for f in o.stdout.split('\0') if f]
+        loggy.info("git.changes_by_path(): Commited files list: \n" + "\n".join(_files))
+        #
+        # One compiled alternation of all the paths - a single scan per file
+        # instead of files x paths re.search calls.
+        #
+        _combined = re.compile("|".join(f"(?:{p})" for p in path.split()))
+        for _file in _files:
+            if _combined.search(_file):
+                loggy.info(f"git.changes_by_path(): Change in required path found. {_file}")
+                return True
 
     loggy.info("git.changes_by_path(): No changes to files in required path found.")
     return False
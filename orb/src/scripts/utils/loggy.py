@@ -19,46 +19,71 @@ loggy = logging.getLogger()
 loggy.info("loggy Initialized")
 
 
-def debug(msg):
+def debug(msg, *args):
     """
     debug()
 
     Log a DEBUG message to stdout
+
+    Extra args are passed through to logging for lazy %-formatting, so
+    large objects are only stringified when DEBUG is actually enabled.
     """
-    loggy.debug(msg)
+    loggy.debug(msg, *args)
 
 
-def info(msg):
+def info(msg, *args):
     """
     info()
 
     Log an INFO message to stdout
     """
-    loggy.info(msg)
+    loggy.info(msg, *args)
 
 
-def warn(msg):
+def warn(msg, *args):
     """
     warn()
 
     Log a WARNING message to stdout
     """
-    loggy.warning(msg)
+    loggy.warning(msg, *args)
 
 
-def warning(msg):
+def warning(msg, *args):
     """
     warning()
 
     Log a WARNING message to stdout
     """
-    loggy.warning(msg)
+    loggy.warning(msg, *args)
 
 
-def error(msg):
+def error(msg, *args):
     """
     error()
 
     Log an ERROR message to stdout
     """
-    loggy.error(msg)
+    loggy.error(msg, *args)
+
+
+def preview(s, n=4096):
+    """
+    preview()
+
+    Cap a potentially huge string (e.g. a docker build's stdout) for logging,
+    noting how much was cut. Use with lazy %-formatting so hot paths don't
+    build MB-scale log strings up front.
+    """
+    if s is None or len(s) <= n:
+        return s
+    return f"{s[:n]}...[{len(s) - n} bytes truncated]"
+
+
+def exception(msg, *args):
+    """
+    exception()
+
+    Log an ERROR message to stdout with the current traceback
+    """
+    loggy.exception(msg, *args)
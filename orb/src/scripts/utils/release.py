@@ -9,16 +9,19 @@ Example Usage:
     from utils.release import get_new_build_release as _version
 """
 
+import ast
 import datetime
+import functools
 import os
+import shutil
+import subprocess
 import sys
+import time
 import json
-from subprocess_tee import run as _run
 # from aws import cloudfront_get_kvs_key, cloudfront_update_kvs_key
 from enum import Enum
-from dns import resolver
+import types
 import typing
-import requests
 
 sys.path.insert(0, '/home/circleci/bin')
 
@@ -26,12 +29,86 @@ import loggy
 from common import get_environ, resolve_pipeline_variable, ChDir
 # from aws import route53_update_txt_record
 
-last_weight = {}
-last_green_version = {}
-last_blue_version = {}
-last_retrieved = {}
 
-FULL_ROUTING = { "blue": 0, "green": 100}
+def _run(*args, **kwargs):
+    #
+    # subprocess_tee (and its asyncio machinery) is only needed by the git
+    # helpers; import it on first use so version-stamp callers that just want
+    # get_semver()/get_commit_short_hash() don't pay the import at startup.
+    #
+    from subprocess_tee import run
+    return run(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_resolver():
+    """
+    _get_resolver()
+
+    One resolver for the process, with dnspython's own LRU cache attached so
+    even callers that bypass get_routing_info's cache reuse answers and the
+    resolver's socket. dns is imported lazily - only routing lookups need it.
+    """
+    from dns import resolver
+    _r = resolver.Resolver()
+    _r.cache = resolver.LRUCache(max_size=256)
+    return _r
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cci_session():
+    """
+    _get_cci_session()
+
+    Shared keep-alive session for CircleCI API calls - skips a TLS handshake
+    on repeat calls and retries transient gateway errors with backoff.
+    requests is imported lazily for the same startup reason as dns above.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+    _s = requests.Session()
+    _s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])))
+    return _s
+
+
+# Routing TXT lookups, keyed on record_name -> (monotonic retrieved_at,
+# ttl seconds, info dict).
+_routing_cache = {}
+
+# Generated build versions, keyed on (workflow id, date) so a job crossing
+# midnight still gets a fresh date component.
+_build_release_cache = {}
+
+# Read-only routing constants - MappingProxyType keeps callers from mutating
+# the shared table.
+FULL_ROUTING = types.MappingProxyType({"blue": 0, "green": 100})
+
+
+@functools.lru_cache(maxsize=None)
+def _find_env(prefix):
+    """
+    _find_env()
+
+    Return the value of the first environment variable whose name starts with
+    prefix, or None. Memoized per prefix - the environment doesn't change
+    mid-job and several release helpers sweep it for the same GO_* prefixes.
+    """
+    for key, value in os.environ.items():
+        if key.startswith(prefix):
+            return value
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _go_revision_count():
+    """
+    _go_revision_count()
+
+    Count the GO_REVISION_* environment variables once per process - the
+    material list can't change mid-job and this is asked on every hash and
+    branch lookup.
+    """
+    return sum(key.startswith('GO_REVISION_') for key in os.environ)
 
 class Release(Enum):
     DEV = "develop"
@@ -60,9 +137,13 @@ def get_semver():
 
     NOTE: Looks for GO_PIPELINE_COUNTER, then BITBUCKET_BUILD_NUMBER, then CIRCLE_BUILD_NUM in that order.
     """
-    counter = os.environ.get('GO_PIPELINE_COUNTER', os.environ.get('BITBUCKET_BUILD_NUMBER', os.environ.get('CIRCLE_BUILD_NUM', None)))
-    if os.environ.get('VERSION_MAJOR') and os.environ.get('VERSION_MINOR') and counter:
-        return f"{os.environ.get('VERSION_MAJOR')}.{os.environ.get('VERSION_MINOR')}.{counter}"
+    # or-short-circuit: the nested .get defaults evaluated all three lookups
+    # even when the first hit, and VERSION_MAJOR/MINOR were probed twice each.
+    counter = os.environ.get('GO_PIPELINE_COUNTER') or os.environ.get('BITBUCKET_BUILD_NUMBER') or os.environ.get('CIRCLE_BUILD_NUM')
+    major = os.environ.get('VERSION_MAJOR')
+    minor = os.environ.get('VERSION_MINOR')
+    if major and minor and counter:
+        return f"{major}.{minor}.{counter}"
 
     return None
 
@@ -78,20 +159,27 @@ def get_version():
     """
     return get_new_build_release()
 
+@functools.lru_cache(maxsize=1)
 def get_pipeline_number() -> int:
+    #
+    # Memoized - the workflow's pipeline number is immutable for the life of
+    # a job, and this otherwise costs an HTTPS round-trip per call.
+    #
     pipeline_number = 0
     _CIRCLE_WORKFLOW_ID = get_environ('CIRCLE_WORKFLOW_ID')
     _PIPELINE_TRIGGER_TOKEN = get_environ('PIPELINE_TRIGGER_TOKEN')
     if not _CIRCLE_WORKFLOW_ID or not _PIPELINE_TRIGGER_TOKEN:
         loggy.info("release.get_pipeline_number(): Pipeline error. One of CIRCLE_WORKFLOW_ID or PIPELINE_TRIGGER_TOKEN not set on environment.")
-        loggy.info("Dumping available ENV vars for debugging:")
-        for key, value in os.environ.items():
-            loggy.info(f"{key}={value}")
+        #
+        # Keys only, one record, debug level - the old per-variable info loop
+        # was hundreds of writes and leaked secret values into the job log.
+        #
+        loggy.debug("release.get_pipeline_number(): Available ENV keys: %s", sorted(os.environ.keys()))
         return pipeline_number
 
     try:
         loggy.info(f"release.get_pipeline_number(): Getting pipeline_number for workflow: https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}")
-        x = requests.get(f"https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}", headers={"Circle-Token": _PIPELINE_TRIGGER_TOKEN})
+        x = _get_cci_session().get(f"https://circleci.com/api/v2/workflow/{_CIRCLE_WORKFLOW_ID}", headers={"Circle-Token": _PIPELINE_TRIGGER_TOKEN}, timeout=(3, 10))
         if x.status_code < 200 or x.status_code > 299:
             loggy.info(f"release.get_pipeline_number():  ERROR getting pipeline_number. {x.text}")
             return pipeline_number
@@ -117,22 +205,20 @@ def get_new_build_release():
     NOTE: Looks for BITBUCKET_COMMIT, then CIRCLE_SHA1, then GO_REVISION_* in that order
     NOTE: Looks for GO_PIPELINE_COUNTER, then BITBUCKET_BUILD_NUMBER, then CIRCLE_BUILD_NUM in that order.
     """
-    now = datetime.datetime.now().strftime("%y.%m.%d")
-
-    # Roll through the environ variables and set the commit_hash to the first one it finds, default to string 0
-    commit_hash = '0' 
-    if os.environ.get('BITBUCKET_COMMIT', None):
-        commit_hash = os.environ.get('BITBUCKET_COMMIT')[0:7]
-    elif os.environ.get('CIRCLE_SHA1', None):
-        commit_hash = os.environ.get('CIRCLE_SHA1')[0:7]
-    else:
-        for name, value in os.environ.items():
-            if "GO_REVISION_" in name:
-                commit_hash = os.environ.get(name, '0')
-                if len(commit_hash) > 7:
-                    commit_hash = commit_hash[0:7]
-                break
-        
+    # One date.today() call covers both the cache key and the version string;
+    # date.today() skips the time-of-day work datetime.now() does.
+    _today = datetime.date.today()
+    _cache_key = (os.environ.get('CIRCLE_WORKFLOW_ID'), _today)
+    if _cache_key in _build_release_cache:
+        return _build_release_cache[_cache_key]
+
+    now = _today.strftime("%y.%m.%d")
+
+    # Use the first commit hash found, default to string 0. The short-circuit
+    # chain does a single dict probe per candidate instead of get()-twice, and
+    # the GO_REVISION_ sweep is memoized in _find_env.
+    commit_hash = (os.environ.get('BITBUCKET_COMMIT') or os.environ.get('CIRCLE_SHA1') or _find_env('GO_REVISION_') or '0')[:7]
+
     # version = f"{now}{os.environ.get('GO_PIPELINE_COUNTER', os.environ.get('BITBUCKET_BUILD_NUMBER', os.environ.get('CIRCLE_BUILD_NUM', '0')))}.{commit_hash}"
     #
     # NOTE: In circleci, the CIRCLE_BUILD_NUM increments per JOB, so we can't use this on a workflow/pipeline
@@ -140,6 +226,7 @@ def get_new_build_release():
     #
     version = f"{now}.{get_pipeline_number()}.{commit_hash}"
 
+    _build_release_cache[_cache_key] = version
     loggy.info(f"release.get_new_build_release(): Generated build: {version}")
     return version
 
@@ -153,10 +240,10 @@ def _check_for_multiple_materials():
 
     returns: False
     """
-    counter = sum(x.startswith('GO_REVISION_') for x in os.environ.keys())
+    counter = _go_revision_count()
 
     if counter > 1:
-        loggy.error("release.get_commit_short_hash(): Error: (" + counter + ") Materials found in Env. We only support 1 Material right now.")
+        loggy.error(f"release.get_commit_short_hash(): Error: ({counter}) Materials found in Env. We only support 1 Material right now.")
         sys.exit(1)
 
     return False
@@ -172,13 +259,12 @@ def get_commit_short_hash():
 
     NOTE: Looks for BITBUCKET_COMMIT, then CIRCLE_SHA1, then GO_REVISION_* in that order
     """
-    if os.environ.get('BITBUCKET_COMMIT', None):
-        return os.environ.get('BITBUCKET_COMMIT', None)[0:7]
-    elif os.environ.get('CIRCLE_SHA1', None):
-        return os.environ.get('CIRCLE_SHA1')[0:7]
+    _hash = os.environ.get('BITBUCKET_COMMIT') or os.environ.get('CIRCLE_SHA1')
+    if _hash:
+        return _hash[:7]
 
     _check_for_multiple_materials()
-    return next(val for key, val in os.environ.items() if key.startswith('GO_REVISION_'))[0:7]
+    return _find_env('GO_REVISION_')[:7]
 
 
 def get_source_branch():
@@ -191,31 +277,40 @@ def get_source_branch():
 
     NOTE: Looks for BITBUCKET_BRANCH, then CIRCLE_BRANCH, then GO_MATERIAL_BRANCH in that order
     """
-    if os.environ.get('BITBUCKET_BRANCH', None):
-        return os.environ.get('BITBUCKET_BRANCH', None)
-    elif os.environ.get('CIRCLE_BRANCH', None):
-        return os.environ.get('CIRCLE_BRANCH', None)
- 
+    _branch = os.environ.get('BITBUCKET_BRANCH') or os.environ.get('CIRCLE_BRANCH')
+    if _branch:
+        return _branch
+
     _check_for_multiple_materials()
-    try:
-        return next(val for key, val in os.environ.items() if key.startswith('GO_MATERIAL_BRANCH'))
-    except StopIteration as e:
-        loggy.error(f"release.get_source_branch(): No branches found. GO_MATERIAIL_BRANCH_x env vars not found. Is this a GoCD pipeline? {str(e)}")
-        return None
+    _branch = _find_env('GO_MATERIAL_BRANCH')
+    if _branch is None:
+        loggy.error("release.get_source_branch(): No branches found. GO_MATERIAIL_BRANCH_x env vars not found. Is this a GoCD pipeline?")
+    return _branch
 
 
-def get_last_tag():
+def get_last_tag(fetch=False):
     """
     get_last_tag()
 
     Grabs the latest tag in a git repo.
 
+    Asks the remote for tag names with `git ls-remote` - a single ref
+    advertisement instead of `git fetch --all --tags`, which downloads every
+    tag's objects just to read one name.
+
+    fetch: If True, also run the full tag fetch so the tags exist locally.
+
     returns: String or None
     """
-    _run("git fetch --all --tags", check=False, shell=True)
-    latest_tag = _run("git for-each-ref refs/tags --sort=-taggerdate --count=1 --format=\"%(refname)\"", check=False, shell=True)
+    if fetch:
+        _run("git fetch --all --tags", check=False, shell=True)
+
+    latest_tag = _run("git ls-remote --tags --sort=-v:refname origin", check=False, shell=True)
 
-    resolved = latest_tag.stdout.strip().split('/')[-1] if latest_tag else None
+    resolved = None
+    if latest_tag and latest_tag.stdout.strip():
+        _first_ref = latest_tag.stdout.strip().splitlines()[0].split()[-1]
+        resolved = _first_ref.split('/')[-1].replace('^{}', '')
 
     loggy.info(f"release.get_last_tag(): Returning latest tag as: {resolved}")
     return resolved
@@ -301,7 +396,7 @@ def get_last_tag():
 #     return True
 
 
-def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=False) -> bool:
+def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=False, clone_depth=None) -> bool:
     """
     git_promote()
 
@@ -318,6 +413,9 @@ def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=Fal
 
     keep_changes: if True, we'll just use the existing /home/circleci/project path, defaults to False
 
+    clone_depth: if set, limits the fresh clone to that many commits. Leave
+    None for a blob-filtered full-graph clone (merges need the commit graph).
+
     NOTE: Checks if we are running on Bitbucket, then CircleCI, then GoCD
     """
     source_branch = 'develop' if source is None else resolve_pipeline_variable(source)
@@ -332,37 +430,66 @@ def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=Fal
     _REPO_PATH = "/home/circleci/project" 
     
     if not keep_changes:
-        _REPO_PATH = f"/home/circleci/{os.environ.get('CIRCLE_REPOSITORY_URL').split('/')[-1].split('.git')[0]}"
-
-        with ChDir("/home/circleci"):
-            _run(f"git clone {os.environ.get('CIRCLE_REPOSITORY_URL')}", check=True, shell=True)
-
-    with ChDir(_REPO_PATH):
-        _run(f"git checkout {source}", check=True, shell=True)
+        #
+        # CircleCI's default checkout usually already holds this exact repo.
+        # If its origin matches, scrub it clean instead of paying for a whole
+        # fresh clone - that covers the "files modified by accident" concern
+        # without the network cost.
+        #
+        _origin = _run("git -C /home/circleci/project remote get-url origin", check=False, shell=True)
+        if _origin.returncode == 0 and _origin.stdout.strip() == os.environ.get('CIRCLE_REPOSITORY_URL'):
+            loggy.info("release.git_promote(): Reusing /home/circleci/project checkout, cleaning working tree.")
+            with ChDir(_REPO_PATH):
+                _run("git clean -fdx && git reset --hard", check=True, shell=True)
+        else:
+            # basename + removesuffix: one allocation, and no AttributeError
+            # when CIRCLE_REPOSITORY_URL is unset.
+            _repo_url = os.environ.get('CIRCLE_REPOSITORY_URL') or ''
+            _REPO_PATH = f"/home/circleci/{os.path.basename(_repo_url).removesuffix('.git')}"
+
+            with ChDir("/home/circleci"):
+                #
+                # Blob-filtered single-branch clone: we only need the two branch
+                # tips and the commit graph for the merge, not every blob in the
+                # repo's history or its tags.
+                #
+                _depth = f"--depth={clone_depth} " if clone_depth else ""
+                _run(f"git clone --filter=blob:none --no-tags --single-branch --branch {source_branch} {_depth}{_repo_url}", check=True, shell=True)
+
+            with ChDir(_REPO_PATH):
+                # Bring over the destination branch tip; if it doesn't exist yet
+                # the checkout below falls into the create-branch path as before.
+                _run(f"git fetch origin {dest_branch}:{dest_branch}", check=False, shell=True)
 
+    #
+    # No standalone `git checkout {source}` here: the clone already checks out
+    # source_branch via --branch, and the merge sequence below does its own
+    # checkout/pull of source_branch. (The old call also passed the raw,
+    # possibly-None source parameter instead of the resolved branch.)
     #
     # Ensure we are in the right path before running commands
     #
     with ChDir(_REPO_PATH):
-        _run("git status", check=False, shell=True)
-        _run("git config -l", check=False, shell=True)
+        #
+        # Each _run forks a shell plus a git repo-open; batch sequential
+        # steps with && so the promote path forks a handful of times instead
+        # of 10+. Steps with distinct failure handling stay separate.
+        #
+        _run("git status; git config -l", check=False, shell=True)
         _skip_merge = False
 
         try:
-            _run(f"git checkout {dest_branch}", check=True, shell=True)
-            _run(f"git pull origin {dest_branch}", check=True, shell=True)
+            _run(f"git checkout {dest_branch} && git pull origin {dest_branch}", check=True, shell=True)
         except Exception as e:
             # dest branch doesn't exist. creating it
             loggy.error("release.git_promote(): Exception: " + str(e))
-            _run(f"git checkout -b {dest_branch}", check=True, shell=True)
-            _run(f"git push origin {dest_branch}", check=True, shell=True)
+            _run(f"git checkout -b {dest_branch} && git push origin {dest_branch}", check=True, shell=True)
 
             _skip_merge = True
             pass
 
         if not _skip_merge:
-            _run(f"git checkout {source_branch}", check=True, shell=True)
-            _run(f"git pull origin {source_branch}", check=True, shell=True)
+            _run(f"git checkout {source_branch} && git pull origin {source_branch}", check=True, shell=True)
 
             try:
                 loggy.info(f"release.git_promote(): Creating temp release branch {promote_branch}")
@@ -370,13 +497,10 @@ def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=Fal
             except Exception as e:
                 # branch probably already exists...
                 loggy.error("release.git_promote(): Exception: " + str(e))
-                _run(f"git branch -D {promote_branch}", check=True, shell=True)
-                _run(f"git checkout -b {promote_branch}", check=True, shell=True)
+                _run(f"git branch -D {promote_branch} && git checkout -b {promote_branch}", check=True, shell=True)
                 pass
 
-            _run(f"git merge --strategy=ours --no-edit {dest_branch}", check=True, shell=True)
-            _run(f"git checkout {dest_branch}", check=True, shell=True)
-            _run(f"git merge --squash {promote_branch}", check=True, shell=True)
+            _run(f"git merge --strategy=ours --no-edit {dest_branch} && git checkout {dest_branch} && git merge --squash {promote_branch}", check=True, shell=True)
 
             try:
                 output = _run(f"git commit -m \"CiCD merge {source_branch} to {dest_branch} for promotion {version}\"", check=False, shell=True)
@@ -398,8 +522,7 @@ def git_promote(version=None, source=None, dest=None, tag=None, keep_changes=Fal
 
         if 'master' in dest_branch:
             version = get_new_build_release() if tag is None else tag
-            _run(f"git tag -f -a {version} -m \"Rev to version {version}\"", check=True, shell=True)
-            _run(f"git push origin {version}", check=True, shell=True)
+            _run(f"git tag -f -a {version} -m \"Rev to version {version}\" && git push origin {version}", check=True, shell=True)
 
     return True
 
@@ -414,56 +537,52 @@ def get_routing_info(record_name):
 
     returns a json object with weight and color versions. If error, returns empty
     """
-    global last_weight, last_green_version, last_blue_version, last_retrieved
-
     loggy.info("release.get_routing_info: BEGIN")
 
     info = {}
 
-    now = datetime.datetime.now()
-    # Cache the value for 60 seconds to reduce DNS lookups
-    if record_name in last_retrieved and (now - last_retrieved[record_name]).total_seconds() < 30:
-        info['weight'] = last_weight[record_name]
-        info['green'] = last_green_version[record_name]
-        info['blue'] = last_blue_version[record_name]
-        return info
+    now = time.monotonic()
+    # Cache the answer to reduce DNS lookups - at least 30 seconds, longer
+    # when the record's own TTL says it's stable. monotonic() is far cheaper
+    # than building two datetimes and a timedelta on the hit path.
+    _cached = _routing_cache.get(record_name)
+    if _cached and (now - _cached[0]) < _cached[1]:
+        return dict(_cached[2])
 
     try:
-        # Fetch the TXT record for the domain
-        txt_records = resolver.resolve(record_name, "TXT")
-
-        info['weight'] = int(txt_records[0].strings[0])
-        info['green'] = "unknown"
-        info['blue'] = "unknown"
-
-        last_weight[record_name] = info['weight']
-        last_green_version[record_name] = info['green']
-        last_blue_version[record_name] = info['blue']
-        last_retrieved[record_name] = now
-        loggy.info(f"release.get_routing_weight: Return weight: {info['weight']}")
-
-    except ValueError as e:
-        _record = json.loads(txt_records[0].strings[0].decode('utf-8').replace("'", '"'))
-        info['weight'] = _record['weight']
-        #
-        # TODO: Remove this if code and only use the else block. it's only needed for fallback to v2
-        #
-        if 'version' in _record:
-            info['green'] = _record['version']
-            info['blue'] = _record['version']
-        else:
-            info['green'] = _record['green']
-            info['blue'] = _record['blue']
+        # Fetch the TXT record for the domain, decode the payload once, and
+        # only then decide which format it is - the old shape parsed inside
+        # an except ValueError block that referenced txt_records and would
+        # have masked a resolver failure with NameError.
+        txt_records = _get_resolver().resolve(record_name, "TXT")
+        _ttl = max(30, getattr(txt_records.rrset, 'ttl', 0))
+        _raw = txt_records[0].strings[0].decode('utf-8')
 
-        last_weight[record_name] = info['weight']
-        last_green_version[record_name] = info['green']
-        last_blue_version[record_name] = info['blue']
-        last_retrieved[record_name] = now
+        try:
+            info = {'weight': int(_raw), 'green': "unknown", 'blue': "unknown"}
+        except ValueError:
+            #
+            # The record is written as str(info) - Python dict repr - so parse
+            # it with ast.literal_eval instead of the quote-swap + json.loads
+            # hack, which copied the whole string and corrupted any value
+            # containing a single quote.
+            #
+            # TODO: Remove the 'version' fallback and only use green/blue.
+            # It's only needed for fallback to v2.
+            #
+            _record = ast.literal_eval(_raw)
+            info = {
+                'weight': _record['weight'],
+                'green': _record.get('version', _record.get('green')),
+                'blue': _record.get('version', _record.get('blue')),
+            }
+
+        _routing_cache[record_name] = (now, _ttl, dict(info))
         loggy.info(f"release.get_routing_weight: Return weight: {info['weight']}")
 
     except Exception as e:
-        print(f"release.get_routing_weight(): Error resolving DNS for {record_name}: {e}") 
-    
+        print(f"release.get_routing_weight(): Error resolving DNS for {record_name}: {e}")
+
     return info  # Default to {} if DNS fails
 
 # def get_routing_weight(record_name):
@@ -585,12 +704,23 @@ def package(folder: str, app_name: typing.Optional[str] = None, version: typing.
     if app_name:
         artifact_name = f"{app_name}-{artifact_name}"
 
+    #
+    # Archive from the folder's parent so entries are relative (portable on
+    # extraction), with a plain subprocess.run on a list argv - no shell, no
+    # subprocess_tee stdout pump. Compress with pigz when it's on the agent -
+    # gzip output, but spread across every core.
+    #
+    _abs_folder = os.path.abspath(folder)
+    _artifact_path = os.path.abspath(artifact_name)
+    _compress = ['-I', 'pigz', '-cf'] if shutil.which('pigz') else ['-zcf']
     try:
-        _run(f"tar -zcvf {artifact_name} {folder}", check=True, shell=True)
+        subprocess.run(
+            ['tar'] + _compress + [_artifact_path, os.path.basename(_abs_folder)],
+            cwd=os.path.dirname(_abs_folder), capture_output=True, check=True)
     except Exception as e:
         loggy.info(f"release.package() Failed to create package {artifact_name} for {folder}. {str(e)}")
         return None
-    
+
     return artifact_name
 
 def create_robots_txt(body: str, robots_path: str) -> bool:
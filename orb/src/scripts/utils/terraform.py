@@ -9,118 +9,312 @@ Example Usage:
     from utils.terraform import plan, apply
 """
 
+import functools
+import mmap
 import subprocess
 import os
 import sys
-from pathlib import Path
 import re
+import threading
 import typing
-import glob
 import shutil
 
 sys.path.insert(0, '/home/circleci/bin')
 
 import loggy
-from common import subprocess_long as _long_run, ChDir as _chdir
+from common import subprocess_stream as _stream_run
+
+#
+# shutil.which stats every PATH entry; memoize it since the same binaries are
+# looked up on every plan/apply. Cleared after anything installs a binary.
+#
+_which = functools.lru_cache(maxsize=64)(shutil.which)
+
+#
+# Directories that can hold thousands of files but never our tf configs.
+#
+_TF_SEARCH_PRUNE = {'.terraform', 'node_modules', '.git', '.venv', 'venv', '__pycache__'}
+
+#
+# Version-string patterns, compiled once instead of per call.
+#
+_RE_TF_VERSION = re.compile(rb'Terraform v?([0-9]+\.[0-9]+(?:\.[0-9]+)?)')
+_RE_REQUIRED = re.compile(rb'required_version\s*=\s*"([^"]+)"')
+_RE_VER_NUM = re.compile(r'([0-9]+\.[0-9]+(?:\.[0-9]+)?)')
+
+#
+# Pid of the process that last passed verify_terraform_installed(). Storing
+# the pid (rather than a bool) keeps a forked child from inheriting the
+# verdict; plan() followed by apply() skips the whole re-check.
+#
+_terraform_verified: typing.Optional[int] = None
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_pkg_manager() -> typing.Optional[typing.Tuple[str, typing.List[str]]]:
+    """
+    _detect_pkg_manager()
+
+    Probe for a usable package manager once per process instead of walking
+    the apt/brew/yum chain on every install attempt.
 
-def plan(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+    Returns: (name, terraform install argv) tuple, or None
     """
-    plan()
+    if _which('apt'):
+        return ('apt', ['sudo', 'apt', 'install', '-y', 'terraform'])
+    if _which('brew'):
+        return ('brew', ['brew', 'install', 'terraform'])
+    if _which('yum'):
+        return ('yum', ['sudo', 'yum', 'install', '-y', 'terraform'])
+    return None
 
-    For terraform, runs `plan` using the `tfwrapper` helper script. The function signature is
-    preserved for backwards compatibility but the implementation executes terraform via
-    `tfwrapper plan` with the provided environment.
 
-    Returns: True/False
+def _find_first(predicate, root='.'):
     """
+    _find_first()
 
-    _TARGET_DIR = get_terraform_path(path)
-    # _PROPS_FILE = f"properties.{properties_env}.json"
-    _TF_PLAN_FILE = f"{os.getcwd()}/tf.plan.txt"
+    Depth-first os.scandir walk that returns the path of the first entry
+    whose name satisfies predicate, or None. Unlike a recursive glob this
+    stops at the first hit instead of materializing (and sorting) every
+    match in the tree, and it prunes dependency/VCS dirs.
+    """
+    _stack = [root]
+    while _stack:
+        _dir = _stack.pop()
+        try:
+            with os.scandir(_dir) as _entries:
+                for _entry in _entries:
+                    if _entry.is_file() and predicate(_entry.name):
+                        return _entry.path
+                    if _entry.is_dir() and _entry.name not in _TF_SEARCH_PRUNE and not _entry.name.startswith('.'):
+                        _stack.append(_entry.path)
+        except OSError:
+            continue
+    return None
 
-    loggy.info(f"terraform.plan(): Running with target: {_TARGET_DIR}")
+@functools.lru_cache(maxsize=1)
+def _load_tfwrapper_main(tfwrap_path: str):
+    """
+    _load_tfwrapper_main()
 
-    # Ensure terraform is installed (attempt installation if possible)
-    if not verify_terraform_installed():
-        loggy.info("terraform.plan(): Terraform not available and could not be installed using tfenv.")
-        return False
+    Import the tfwrapper script as a module so plan/apply can call its main()
+    in-process instead of paying a fresh python3 interpreter start (and its
+    module imports) per invocation. Returns the main callable, or None when
+    the script can't be imported or doesn't expose main() - callers then fall
+    back to the subprocess path.
+    """
+    import importlib.util
+    try:
+        _spec = importlib.util.spec_from_file_location('tfwrap', tfwrap_path)
+        _module = importlib.util.module_from_spec(_spec)
+        _spec.loader.exec_module(_module)
+    except Exception:
+        return None
+    return getattr(_module, 'main', None)
 
-    aws_session_env = os.environ.copy()
-    aws_session_env["ENV"] = properties_env
 
-    # locate the tfwrapper script relative to this file
-    # tfwrapper_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bin', 'tfwrapper'))
-    tfwrapper_path = shutil.which('tfwrap')
-    if not tfwrapper_path:
-      loggy.info("terraform.plan(): tfwrap not available and could not be installed.")
-      return False
+class _LazyFile:
+    """
+    File-like wrapper that opens its target (wide-buffered) only when data
+    actually arrives, so an all-quiet run never creates/truncates an empty
+    result file.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._file = None
 
-    with _chdir(_TARGET_DIR):
-      loggy.info("terraform.plan(): Running tfwrapper plan")
-      _process_output = _long_run(
-          ['python3', tfwrapper_path, 'plan', '-e', properties_env], env=aws_session_env, check=False)
+    def write(self, data):
+        if data:
+            if self._file is None:
+                self._file = open(self._path, 'w', buffering=1 << 16)
+            self._file.write(data)
+        return len(data)
 
-      loggy.info("----------------------------------")
-      loggy.info(f"terraform.plan(): tfwrapper returned {str(_process_output.returncode)}")
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
 
-    with open(_TF_PLAN_FILE, 'w') as file:
-        if _process_output.stderr:
-            file.write(_process_output.stderr)
+    def close(self):
+        if self._file is not None:
+            self._file.close()
 
-        if _process_output.stdout:
-            file.write(_process_output.stdout)
 
-    return _process_output.returncode == 0
+def _run_tfwrapper_inprocess(main, argv, outfile, properties_env, cwd) -> int:
+    """
+    _run_tfwrapper_inprocess()
+
+    Call an imported tfwrapper main() with the cwd/ENV the subprocess path
+    would have given it, streaming its output to outfile and stdout.
 
+    The capture happens at the fd level (dup2 of fds 1/2 onto a pipe):
+    tfwrapper's terraform children inherit the raw fds and its logging
+    handler bound the real stream at import time, so a Python-level
+    redirect_stdout would miss both. A pump thread tees the pipe into the
+    result file and the real stdout.
 
-def apply(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None) -> bool:
+    Returns: the exit code main() returned (or raised via sys.exit)
     """
-    apply()
+    _saved_env = os.environ.get('ENV')
+    _saved_cwd = os.getcwd()
+    os.environ['ENV'] = properties_env
+    _file = _LazyFile(outfile)
+    _read_fd, _write_fd = os.pipe()
+    _real_out = os.dup(1)
+    _real_err = os.dup(2)
+
+    def _pump():
+        while True:
+            _chunk = os.read(_read_fd, 1 << 16)
+            if not _chunk:
+                break
+            _file.write(_chunk.decode(errors='replace'))
+            os.write(_real_out, _chunk)
+        os.close(_read_fd)
+
+    _reader = threading.Thread(target=_pump, daemon=True)
+    _capturing = False
+    try:
+        os.chdir(cwd)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(_write_fd, 1)
+        os.dup2(_write_fd, 2)
+        os.close(_write_fd)
+        _reader.start()
+        _capturing = True
+        try:
+            _rc = main(argv)
+        except SystemExit as e:
+            _rc = e.code
+        except Exception as e:
+            loggy.info(f"terraform._run_tfwrapper_inprocess(): tfwrapper raised {str(e)}")
+            _rc = 1
+        if _rc is None:
+            _rc = 0
+        return _rc if isinstance(_rc, int) else 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Restoring fds 1/2 drops the last write end of the pipe; the pump
+        # then sees EOF and drains whatever is left before we close up.
+        os.dup2(_real_out, 1)
+        os.dup2(_real_err, 2)
+        if _capturing:
+            _reader.join()
+        else:
+            os.close(_read_fd)
+            os.close(_write_fd)
+        os.close(_real_out)
+        os.close(_real_err)
+        _file.close()
+        os.chdir(_saved_cwd)
+        if _saved_env is None:
+            os.environ.pop('ENV', None)
+        else:
+            os.environ['ENV'] = _saved_env
 
-    For terraform, runs `apply` using the `tfwrapper` helper script. The signature is
-    preserved for backwards compatibility but the implementation executes terraform via
-    `tfwrapper apply` with the provided environment.
+
+def _run_tfwrapper(sub: str, extra: typing.List[str], properties_env: str, out_path: str, path: typing.Optional[str] = None, parallelism: typing.Optional[int] = None) -> bool:
+    """
+    _run_tfwrapper()
+
+    Shared body for plan()/apply(): verify the toolchain, locate tfwrap,
+    build the argv, and run it. They were near-identical copies; one
+    implementation means the verify/which/env work (and its caching) lives
+    in a single place.
+
+    sub: tfwrapper subcommand ('plan' or 'apply')
+    extra: extra argv appended after `-e <env>` (e.g. ['--force'])
 
     Returns: True/False
     """
 
     _TARGET_DIR = get_terraform_path(path)
-    # _PROPS_FILE = f"properties.{properties_env}.json"
-    _TF_APPLY_FILE = f"{os.getcwd()}/tf.apply.txt"
 
-    loggy.info(f"terraform.apply(): Running with target: {_TARGET_DIR}")
+    loggy.info(f"terraform.{sub}(): Running with target: {_TARGET_DIR}")
 
-    # Ensure terraform is installed
+    # Ensure terraform is installed (attempt installation if possible)
     if not verify_terraform_installed():
-        loggy.info("terraform.apply(): Terraform not available and could not be installed using tfenv.")
+        loggy.info(f"terraform.{sub}(): Terraform not available and could not be installed using tfenv.")
         return False
 
-    aws_session_env = os.environ.copy()
-    aws_session_env["ENV"] = properties_env
-
-    # tfwrapper_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bin', 'tfwrapper'))
-    tfwrapper_path = shutil.which('tfwrap')
+    tfwrapper_path = _which('tfwrap')
     if not tfwrapper_path:
-      loggy.info("terraform.apply(): tfwrap not available and could not be installed.")
+      loggy.info(f"terraform.{sub}(): tfwrap not available and could not be installed.")
       return False
 
-    with _chdir(_TARGET_DIR):
-      loggy.info("terraform.apply(): Running tfwrapper apply")
-      _process_output = _long_run(
-          ['python3', tfwrapper_path, 'apply', '-e', properties_env, '--force'], env=aws_session_env, check=False)
+    loggy.info(f"terraform.{sub}(): Running tfwrapper {sub}")
+    _tf_args = [sub, '-e', properties_env] + list(extra)
+    _parallelism = parallelism or os.environ.get('TF_PARALLELISM')
+    if _parallelism:
+        _tf_args += ['-parallelism', str(_parallelism)]
+
+    #
+    # Prefer calling tfwrapper in-process - spawning a fresh python3 just to
+    # run another python script costs an interpreter start plus re-imports on
+    # every run. Fall back to the streaming subprocess when the script can't
+    # be imported or has no main().
+    #
+    _tf_main = _load_tfwrapper_main(tfwrapper_path)
+    if _tf_main:
+        _returncode = _run_tfwrapper_inprocess(
+            _tf_main, _tf_args, out_path, properties_env, _TARGET_DIR)
+    else:
+        #
+        # Env overlay built only on this path (the in-process call sets ENV
+        # directly) and inline - no named full copy of the 200+ var CI env.
+        #
+        _returncode, _ = _stream_run(
+            ['python3', tfwrapper_path] + _tf_args, outfile=out_path,
+            env={**os.environ, "ENV": properties_env}, cwd=_TARGET_DIR)
+
+    loggy.info("----------------------------------")
+    loggy.info(f"terraform.{sub}(): tfwrapper returned {str(_returncode)}")
+
+    return _returncode == 0
+
+
+def plan(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None, parallelism: typing.Optional[int] = None) -> bool:
+    """
+    plan()
 
-      loggy.info("----------------------------------")
-      loggy.info(f"terraform.apply(): tfwrapper returned {str(_process_output.returncode)}")
+    For terraform, runs `plan` using the `tfwrapper` helper script. The function signature is
+    preserved for backwards compatibility but the implementation executes terraform via
+    `tfwrapper plan` with the provided environment.
 
-    with open(_TF_APPLY_FILE, 'w') as file:
-        if _process_output.stderr:
-            file.write(_process_output.stderr)
+    parallelism: (Optional) concurrent terraform graph walks; defaults to the
+    TF_PARALLELISM env variable, else terraform's own default of 10.
 
-        if _process_output.stdout:
-            file.write(_process_output.stdout)
+    Returns: True/False
+    """
+
+    return _run_tfwrapper(
+        'plan', [], properties_env, f"{os.getcwd()}/tf.plan.txt", path=path, parallelism=parallelism)
+
+
+def apply(properties_env: str, lang: typing.Optional[str] = None, path: typing.Optional[str] = None, poetry_path: typing.Optional[str] = None, poetry_install_cmd: typing.Optional[str] = None, parallelism: typing.Optional[int] = None, refresh: typing.Optional[bool] = None) -> bool:
+    """
+    apply()
+
+    For terraform, runs `apply` using the `tfwrapper` helper script. The signature is
+    preserved for backwards compatibility but the implementation executes terraform via
+    `tfwrapper apply` with the provided environment.
 
-    # Return True if the plan/process exited successfully
-    return _process_output.returncode == 0
+    parallelism: (Optional) concurrent terraform graph walks; defaults to the
+    TF_PARALLELISM env variable, else terraform's own default of 10.
+
+    refresh: (Optional) pass False to skip the pre-apply state refresh on
+    configurations with many resources.
+
+    Returns: True/False
+    """
+
+    _extra = ['--force']
+    if refresh is False:
+        _extra.append('-refresh=false')
+
+    return _run_tfwrapper(
+        'apply', _extra, properties_env, f"{os.getcwd()}/tf.apply.txt", path=path, parallelism=parallelism)
 
 
 def verify_terraform_installed() -> bool:
@@ -130,9 +324,13 @@ def verify_terraform_installed() -> bool:
     to install it via `tfenv` (if available), otherwise fall back to package managers
     when possible.
     """
+    global _terraform_verified
+    if _terraform_verified == os.getpid():
+        return True
+
     loggy.info("terraform.verify_terraform_installed(): BEGIN")
 
-    terraform_path = shutil.which('terraform')
+    terraform_path = _which('terraform')
     if terraform_path:
       loggy.info(f"terraform.verify_terraform_installed(): Found terraform at {terraform_path}")
       # return True
@@ -145,28 +343,39 @@ def verify_terraform_installed() -> bool:
         _required = None
 
     # Try tfenv if present
-    if not shutil.which('tfenv'):
+    if not _which('tfenv'):
       # install tfenv from git
       CICD_HOME = os.environ.get('CICD_HOME', '/tmp')
       subprocess.run(['git', 'clone', '--depth=1', 'https://github.com/tfutils/tfenv.git', f'{CICD_HOME}/.tfenv'], check=True)
       subprocess.run(['sudo', 'ln', '-s', f'{CICD_HOME}/.tfenv/bin/tfenv', '/usr/local/bin/tfenv'], check=True)
       subprocess.run(['sudo', 'ln', '-s', f'{CICD_HOME}/.tfenv/bin/terraform', '/usr/local/bin/terraform'], check=True)
+      _which.cache_clear()
 
     try:
       if _required:
         # tfenv expects a specific version (strip operators if present)
         # take first numeric-looking section from the constraint
-        m = re.search(r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)", _required)
+        m = _RE_VER_NUM.search(_required)
         ver = m.group(1) if m else None
         if ver:
+          #
+          # Skip the install/use forks entirely when that exact version is
+          # already the active terraform - the common warm-executor case.
+          #
+          if terraform_path and get_terraform_installed_version() == ver:
+            _terraform_verified = os.getpid()
+            return True
           subprocess.run(['tfenv', 'install', ver], check=True)
           subprocess.run(['tfenv', 'use', ver], check=True)
       else:
         subprocess.run(['tfenv', 'install', 'latest'], check=True)
         subprocess.run(['tfenv', 'use', 'latest'], check=True)
 
-      # verify
-      terraform_path = shutil.which('terraform')
+      # verify (a fresh install means the negative lookup above is stale)
+      _which.cache_clear()
+      terraform_path = _which('terraform')
+      if terraform_path:
+        _terraform_verified = os.getpid()
       return bool(terraform_path)
     except Exception:
       loggy.info("terraform.verify_terraform_installed(): tfenv failed to install terraform")
@@ -175,16 +384,16 @@ def verify_terraform_installed() -> bool:
 
     # # Try common package managers (best-effort)
     # try:
-    #   if shutil.which('apt'):
+    #   if _which('apt'):
     #     subprocess.run(['sudo', 'apt', 'update'], check=True)
     #     subprocess.run(['sudo', 'apt', 'install', '-y', 'terraform'], check=True)
-    #   elif shutil.which('brew'):
+    #   elif _which('brew'):
     #     subprocess.run(['brew', 'install', 'terraform'], check=True)
-    #   elif shutil.which('yum'):
+    #   elif _which('yum'):
     #     subprocess.run(['sudo', 'yum', 'install', '-y', 'terraform'], check=True)
     # except Exception:
     #   loggy.info("terraform.verify_terraform_installed(): package manager installation attempt failed")
-    # terraform_path = shutil.which('terraform')
+    # terraform_path = _which('terraform')
     # return bool(terraform_path)
 
 def get_terraform_installed_version() -> str:
@@ -196,20 +405,32 @@ def get_terraform_installed_version() -> str:
 
     loggy.info("terraform.get_terraform_installed_version(): BEGIN")
 
-    terraform_path = shutil.which('terraform')
+    terraform_path = _which('terraform')
     if terraform_path:
       try:
-        process_output = subprocess.run(
-            ['terraform', '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        out = process_output.stdout.decode() or process_output.stderr.decode()
-        # Terraform prints like: Terraform v1.4.0
-        m = re.search(r'Terraform v?([0-9]+\.[0-9]+(?:\.[0-9]+)?)', out)
-        if m:
-          return m.group(1)
+        return __read_terraform_version(terraform_path, os.path.getmtime(terraform_path))
       except Exception:
         return None
     return None
 
+
+@functools.lru_cache(maxsize=None)
+def __read_terraform_version(terraform_path: str, mtime: float) -> str:
+    #
+    # One `terraform --version` fork per binary+mtime - replacing the binary
+    # (tfenv install) bumps the mtime, so the cache stays honest across
+    # repeat plan/apply calls in the same process.
+    #
+    process_output = subprocess.run(
+        ['terraform', '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    out = process_output.stdout or process_output.stderr
+    # Terraform prints like: Terraform v1.4.0 - on the first line, possibly
+    # followed by a long "provider outdated" block we never need to decode.
+    m = _RE_TF_VERSION.search(out[:128])
+    if m:
+      return m.group(1).decode()
+    return None
+
 def get_terraform_required_version() -> str:
     """
     get_terraform_required_version()
@@ -218,14 +439,11 @@ def get_terraform_required_version() -> str:
     If no file found, fall back to the installed terraform version.
     """
     loggy.info("terraform.get_terraform_required_version(): BEGIN")
-    versions_files = glob.glob('**/versions.tf', recursive=True)
+    versions_file = _find_first(lambda name: name == 'versions.tf')
     _TF_REQUIRED = None
-    if versions_files:
+    if versions_file:
         try:
-            content = Path(versions_files[0]).read_text()
-            m = re.search(r'required_version\s*=\s*"([^"]+)"', content)
-            if m:
-                _TF_REQUIRED = m.group(1).strip()
+            _TF_REQUIRED = __read_required_version(versions_file, os.path.getmtime(versions_file))
         except Exception:
             _TF_REQUIRED = None
     # if not _TF_REQUIRED:
@@ -235,6 +453,21 @@ def get_terraform_required_version() -> str:
     return _TF_REQUIRED
 
 
+@functools.lru_cache(maxsize=None)
+def __read_required_version(path: str, mtime: float) -> str:
+    # File parse cached keyed on its mtime so edits still take effect.
+    # Scan the raw bytes through mmap - no full-file UTF-8 decode just to
+    # pull one constraint string near the top; only the match is decoded.
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, 'rb') as _fh:
+        with mmap.mmap(_fh.fileno(), 0, access=mmap.ACCESS_READ) as _mm:
+            m = _RE_REQUIRED.search(_mm)
+            if m:
+                return m.group(1).decode().strip()
+    return None
+
+
 def set_terraform_installed_version() -> str:
     """
     set_terraform_installed_version()
@@ -260,11 +493,13 @@ def set_terraform_installed_version() -> str:
 
     if _TF_REQUIRED_VERSION != _TF_INSTALLED_VERSION:
         # Try tfenv first
-        if shutil.which('tfenv'):
+        if _which('tfenv'):
           try:
-            m = re.search(r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)", _TF_REQUIRED_VERSION)
+            m = _RE_VER_NUM.search(_TF_REQUIRED_VERSION)
             ver = m.group(1) if m else None
-            if ver:
+            # The constraint can differ from the installed string while still
+            # resolving to the same version - don't reinstall in that case.
+            if ver and ver != _TF_INSTALLED_VERSION:
               subprocess.run(['tfenv', 'install', ver], check=True)
               subprocess.run(['tfenv', 'use', ver], check=True)
           except Exception:
@@ -272,15 +507,16 @@ def set_terraform_installed_version() -> str:
         else:
           # Best-effort package manager attempt
           try:
-            if shutil.which('apt'):
-              subprocess.run(['sudo', 'apt', 'update'], check=True)
-              subprocess.run(['sudo', 'apt', 'install', '-y', 'terraform'], check=True)
-            elif shutil.which('brew'):
-              subprocess.run(['brew', 'install', 'terraform'], check=True)
-            elif shutil.which('yum'):
-              subprocess.run(['sudo', 'yum', 'install', '-y', 'terraform'], check=True)
+            _pkg = _detect_pkg_manager()
+            if _pkg:
+              _pkg_name, _install_cmd = _pkg
+              if _pkg_name == 'apt':
+                subprocess.run(['sudo', 'apt', 'update'], check=True)
+              subprocess.run(_install_cmd, check=True)
           except Exception:
             loggy.info('terraform.set_terraform_installed_version(): package manager install attempt failed')
+        # Any of the branches above may have put a new binary on PATH.
+        _which.cache_clear()
 
     loggy.info("terraform.set_terraform_installed_version(): END")
     return _TF_REQUIRED_VERSION
@@ -296,6 +532,19 @@ def get_terraform_path(path: typing.Optional[str]) -> str:
     if terraform_path_env is not None:
         return terraform_path_env
 
+    return _default_terraform_path(os.getcwd())
+
+
+@functools.lru_cache(maxsize=8)
+def _default_terraform_path(cwd: str) -> str:
+    #
+    # The tree walk is the expensive part; keyed on the cwd so plan+apply in
+    # the same process (the common case) pay for it once. The env/argument
+    # fast paths above stay uncached and keep working if TERRAFORM_PATH is
+    # exported between calls.
+    #
     # Assumes the terraform path is the directory containing the properties.ENV.json file
-    return os.path.dirname(
-        glob.glob('**/properties.*.json', recursive=True)[0])
+    _props = _find_first(lambda name: name.startswith('properties.') and name.endswith('.json'))
+    if _props is None:
+        raise FileNotFoundError("No properties.*.json found under the current directory")
+    return os.path.dirname(_props)
@@ -8,6 +8,7 @@ Example Usage:
     from utils import build, install
     from utils.yarn import build, install
 """
+import functools
 import os
 import sys
 import typing
@@ -18,6 +19,9 @@ sys.path.insert(0, '/home/circleci/bin')
 import loggy
 from common import subprocess_long as _long_run
 
+# Memoized PATH lookup - yarn() re-checks for the yarn binary on every call.
+_which = functools.lru_cache(maxsize=64)(shutil.which)
+
 
 def yarn(*args) -> bool:
     """
@@ -36,13 +40,18 @@ def yarn(*args) -> bool:
     #
     # Test if args[0] is a list. If it is, then use that to build the command. Else, make the args tuple into a list.
     #
-    if type(args[0]) == list:
-        cmd = ["yarn"] + args[0]
+    if isinstance(args[0], (list, tuple)):
+        cmd = ["yarn"] + list(args[0])
     else:
         cmd = ["yarn"] + list(args)
-    
+
     loggy.info(f"yarn.yarn(): stdout: {' '.join(cmd)}")
-    output = _long_run(' '.join(cmd), check=False)
+    #
+    # Pass the argv list straight through - joining to a string forced
+    # subprocess_long into shell=True, which costs an extra /bin/sh fork and
+    # re-parses (and can misquote) every argument.
+    #
+    output = _long_run(cmd, check=False)
     loggy.info(f"yarn.yarn(): stdout: {output.stdout}")
     loggy.info(f"yarn.yarn(): stderr: {output.stderr}")
     loggy.info(f"yarn.yarn(): return: {str(output.returncode)}")
@@ -57,9 +66,18 @@ def build() -> bool:
     return yarn("build")
 
 def install() -> bool:
-    return yarn("install")
+    #
+    # Point yarn at a persistent cache dir (restored by the CI cache step) and
+    # prefer it over the network; --frozen-lockfile also skips the resolution
+    # pass when yarn.lock is unchanged.
+    #
+    _cache_dir = os.environ.get("YARN_CACHE_DIR", "/home/circleci/.yarn-cache")
+    return yarn("install", "--prefer-offline", "--frozen-lockfile", "--cache-folder", _cache_dir)
 
+@functools.lru_cache(maxsize=1)
 def check_yarn_installed() -> bool:
+    # Cached for the process lifetime - yarn() re-checks on every call and
+    # yarn doesn't get uninstalled mid-build.
     loggy.info("yarn.check_yarn_installed(): BEGIN")
     if not is_command_on_path("yarn"):
         loggy.info("yarn.check_yarn_installed(): Yarn not installed.")
@@ -74,4 +92,4 @@ def is_command_on_path(command):
     :param command: The command to check (e.g., 'python', 'ls').
     :return: True if the command is found, False otherwise.
     """
-    return shutil.which(command) is not None
\ No newline at end of file
+    return _which(command) is not None
\ No newline at end of file
@@ -5,8 +5,10 @@ yarn_build
 Run a yarn build
 
 """
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, '/home/circleci/bin')
 
@@ -36,6 +38,13 @@ if not _ARTIFACTS_BUCKET:
 version = get_version()
 loggy.info(f"yarn_build(): Realase version created as {version}")
 
+#
+# Share one yarn cache across builds on this agent (Yarn Berry honors these;
+# classic yarn picks its cache dir up from install()'s --cache-folder).
+#
+os.environ.setdefault('YARN_ENABLE_GLOBAL_CACHE', 'true')
+os.environ.setdefault('YARN_GLOBAL_FOLDER', '/home/circleci/.yarn-global')
+
 with ChDir(_BUILD_PATH):
     if not install():
         loggy.info("yarn_build(): Failed to install yarn packages.")
@@ -49,8 +58,10 @@ with ChDir(_BUILD_PATH):
 
     try:
         # Write the version to a file in a json blob so it's read from the web properly.
-        with open(f"{_DIST_PATH}/{_VERSION_FILE}", "w") as version_file:
-            version_file.write("{ \"version\": \"" + version + "\" }")
+        # json.dump escapes properly - the old hand-built string broke on any
+        # quote in the version.
+        with open(f"{_DIST_PATH}/{_VERSION_FILE}", "w", buffering=1 << 16) as version_file:
+            json.dump({"version": version}, version_file, separators=(',', ':'))
     except Exception as e:
         loggy.info(f"yarn_build(): Failed to write version file to {_DIST_PATH}/{_VERSION_FILE}. {str(e)}")
         sys.exit(1)
@@ -61,21 +72,29 @@ with ChDir(_BUILD_PATH):
         sys.exit(1)
 
     #
-    # Push the new artifact file to the build artifacts S3 bucket
+    # Push the new artifact file to the build artifacts S3 bucket, and write
+    # the trigger-parameter export while the network-bound upload runs - the
+    # two only share the already-known artifact name.
     #
     loggy.info(f"yarn_build(): Pushing artifact {_package} to artifact bucket {_ARTIFACTS_BUCKET} in S3.")
-    if not s3_cp(s3_bucket=f"s3://{_ARTIFACTS_BUCKET}", 
-                s3_path=f"{_APP_NAME}/", 
-                files=_package):
-        sys.exit(1)
+    with ThreadPoolExecutor(max_workers=1) as _executor:
+        _upload_future = _executor.submit(
+            s3_cp, s3_bucket=f"s3://{_ARTIFACTS_BUCKET}",
+            s3_path=f"{_APP_NAME}/",
+            files=_package)
 
-    #
-    # Push our artifact file into the build args for future commands/jobs in this
-    # pipeline to read in. This is so we can trigger the deploy pipelines with 
-    # the version/archive file.
-    #
-    if not push_export_to_env(export_name="_TRIGGER_PARAMETERS", export_value=f"ARTIFACTS_FILE={_APP_NAME}/{_package}"):
-        logger.info("Failed to push ARTIFACT_FILE into pipeline BASH_ENV as a trigger parameter")
+        #
+        # Push our artifact file into the build args for future commands/jobs in this
+        # pipeline to read in. This is so we can trigger the deploy pipelines with
+        # the version/archive file.
+        #
+        _export_ok = push_export_to_env(export_name="_TRIGGER_PARAMETERS", export_value=f"ARTIFACTS_FILE={_APP_NAME}/{_package}")
+
+        if not _upload_future.result():
+            sys.exit(1)
+
+    if not _export_ok:
+        loggy.info("Failed to push ARTIFACT_FILE into pipeline BASH_ENV as a trigger parameter")
         sys.exit(1)
 
 sys.exit(0)
\ No newline at end of file